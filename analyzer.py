@@ -1,8 +1,12 @@
 # analyzer.py
 
 import re
-from typing import Dict, List, Tuple
-from role_profiles import resolve_role_profile
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+from role_profiles import COMPILED_PROFILES, resolve_role_profile
+from signal_matcher import SignalHits, SignalMatcher
+
+if TYPE_CHECKING:
+    from features import ResumeFeatures
 
 
 # -------------------------------------------------
@@ -18,30 +22,105 @@ SECTION_HEADERS = [
 ]
 
 
-def split_into_sections(text: str) -> Dict[str, str]:
-    text = text.lower()
-    sections = {"header": ""}
-    current = "header"
-
-    lines = re.split(r"\n", text)
-
-    for line in lines:
-        clean = line.strip()
-        if not clean:
-            continue
-
-        header_found = False
-        for h in SECTION_HEADERS:
-            if h in clean:
-                current = h
-                sections[current] = ""
-                header_found = True
-                break
-
-        if not header_found:
-            sections[current] += clean + " "
-
-    return sections
+# A header line starts with a section word, optionally after up to two
+# qualifiers ("technical skills", "licenses & certifications").
+HEADER_PATTERN = re.compile(
+    r"[ \t]*(?:[a-z&/+-]+[ \t]+){0,2}(" + "|".join(SECTION_HEADERS) + r")\b"
+)
+
+# Longer lines only count as headers when set in bold / larger type,
+# so "experience with ..." inside a sentence never opens a section.
+MAX_HEADER_WORDS = 4
+
+
+class SectionSplitter:
+    """
+    Incremental section splitter: text can be fed in arbitrary chunks
+    (e.g. one PDF page at a time). Only the current partial line and the
+    per-section buffers are held.
+
+    Complete lines are processed a block at a time: header words are
+    located with str.find, only the lines containing one are checked
+    against HEADER_PATTERN, and each body run between headers is
+    normalized in bulk, so splitting is linear in the input size.
+
+    header_hints holds lowercased lines seen in emphasized type; it may
+    grow while feeding, e.g. one page of hints at a time.
+    """
+
+    def __init__(self, header_hints: Optional[Set[str]] = None):
+        self.header_hints = header_hints if header_hints is not None else set()
+        self._parts: Dict[str, List[str]] = {"header": []}
+        self._current = "header"
+        self._pending = ""
+
+    def _headers(self, block: str) -> List[Tuple[int, int, str]]:
+        """
+        (line start, line end, section) of every header line in block,
+        in order.
+        """
+        headers = {}
+        for word in SECTION_HEADERS:
+            idx = block.find(word)
+            while idx != -1:
+                start = block.rfind("\n", 0, idx) + 1
+                end = block.find("\n", idx)
+                if end == -1:
+                    end = len(block)
+
+                if start not in headers:
+                    line = block[start:end]
+                    match = HEADER_PATTERN.match(line)
+                    if match is not None:
+                        clean = line.strip()
+                        if (
+                            len(clean.split()) <= MAX_HEADER_WORDS
+                            or clean in self.header_hints
+                        ):
+                            headers[start] = (start, end, match.group(1))
+
+                # one check per line and word
+                idx = block.find(word, end)
+
+        return [headers[start] for start in sorted(headers)]
+
+    def _append_body(self, block: str, start: int, end: int) -> None:
+        body = " ".join(filter(None, [line.strip() for line in block[start:end].split("\n")]))
+        if body:
+            self._parts[self._current].append(body + " ")
+
+    def _consume(self, block: str) -> None:
+        lowered = block.lower()
+
+        position = 0
+        for start, end, header in self._headers(lowered):
+            self._append_body(lowered, position, start)
+            self._current = header
+            self._parts[header] = []
+            position = end
+
+        self._append_body(lowered, position, len(lowered))
+
+    def feed(self, chunk: str) -> None:
+        data = self._pending + chunk
+        cut = data.rfind("\n") + 1
+        self._pending = data[cut:]
+        if cut:
+            self._consume(data[:cut])
+
+    def close(self) -> Dict[str, str]:
+        self._consume(self._pending)
+        self._pending = ""
+        return {name: "".join(parts) for name, parts in self._parts.items()}
+
+
+def split_into_sections(
+    text: str,
+    header_hints: Optional[Set[str]] = None
+) -> Dict[str, str]:
+    splitter = SectionSplitter(header_hints)
+    splitter.feed(text)
+    return splitter.close()
 
 
 # -------------------------------------------------
@@ -79,10 +158,24 @@ IMPLICIT_SIGNAL_MAP = {
 }
 
 
-def has_implicit_signal(text: str, signal: str) -> bool:
-    text = text.lower()
-    keywords = IMPLICIT_SIGNAL_MAP.get(signal, [])
-    return any(k in text for k in keywords)
+# Every profile phrase plus every implicit keyword, matched in one pass.
+SIGNAL_MATCHER = SignalMatcher(
+    phrases=(
+        phrase
+        for profile in COMPILED_PROFILES.values()
+        for phrase in profile.phrases
+    ),
+    implicit_keywords=IMPLICIT_SIGNAL_MAP
+)
+
+
+def match_signals(resume_text: str) -> SignalHits:
+    """
+    Literal phrase hits and semantic signal hits (literal or implicit)
+    for all role profiles. Per request, features.extract_features
+    computes this once together with the other resume features.
+    """
+    return SIGNAL_MATCHER.match(resume_text)
 
 
 # -------------------------------------------------
@@ -92,13 +185,20 @@ def has_implicit_signal(text: str, signal: str) -> bool:
 def score_resume(
     resume_text: str,
     sections: Dict[str, str],
-    target_role: str
+    target_role: str,
+    features: Optional["ResumeFeatures"] = None
 ) -> Tuple[int, List[str], Dict[str, List[str]]]:
 
     profile = resolve_role_profile(target_role)
 
-    must_have = profile["must_have"]
-    strong_signals = profile["strong_signals"]
+    if features is None:
+        from features import extract_features
+        features = extract_features(resume_text, sections)
+
+    signals = features.hits.signals
+
+    must_have = profile.must_have
+    strong_signals = profile.strong_signals
 
     score = 100
     reasons = []
@@ -109,13 +209,11 @@ def score_resume(
         "strengths": []
     }
 
-    full_text = resume_text.lower()
-
     # -----------------------------
     # MUST-HAVE SIGNALS (SEMANTIC)
     # -----------------------------
     for item in must_have:
-        if item in full_text or has_implicit_signal(full_text, item):
+        if item in signals:
             diagnostics["strengths"].append(item)
         else:
             diagnostics["missing_must_have"].append(item)
@@ -130,7 +228,7 @@ def score_resume(
     # STRONG SIGNALS (OPTIONAL DEPTH)
     # -----------------------------
     for signal in strong_signals:
-        if signal in full_text or has_implicit_signal(full_text, signal):
+        if signal in signals:
             diagnostics["strengths"].append(signal)
         else:
             diagnostics["weak_signals"].append(signal)
@@ -144,11 +242,11 @@ def score_resume(
     # -----------------------------
     # UNIVERSAL ATS RULES
     # -----------------------------
-    if len(sections.get("skills", "")) > 800:
+    if features.section_chars.get("skills", 0) > 800:
         score -= 8
         reasons.append("Skills section is overloaded and may dilute ATS signals.")
 
-    if "projects" in sections and len(sections["projects"].split()) < 120:
+    if "projects" in sections and features.section_words["projects"] < 120:
         score -= 6
         reasons.append("Projects could benefit from deeper applied context.")
 
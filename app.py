@@ -1,10 +1,28 @@
 # app.py
 
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
 import streamlit as st
-import tempfile
-import os
 
-from report_generator import generate_final_report
+from report_generator import (
+    analyze_resume,
+    build_report,
+    cache_report,
+    cached_report,
+    generate_multi_role_report,
+    NO_REWRITE_TEXT
+)
+from resume_parser import pdf_sha256, read_pdf_bytes
+from pdf_sandbox import PdfParseError
+from llm_engine import (
+    stream_rejection,
+    stream_strengths,
+    stream_ats_diagnostics,
+    rewrite_resume_bullets
+)
 
 # ---------------------------------
 # PAGE CONFIG
@@ -32,8 +50,103 @@ target_role = st.text_input(
     placeholder="Machine Learning Engineer"
 )
 
+compare_roles = st.text_input(
+    "Compare with other roles (optional, comma-separated)",
+    placeholder="Backend Engineer, Data Scientist"
+)
+
 analyze_btn = st.button("Analyze Resume")
 
+
+_STREAM_DONE = object()
+
+
+def stream_in_background(make_stream: Callable[[], Iterator[str]]) -> Iterator[str]:
+    """
+    Starts make_stream() on a producer thread right away and returns a
+    generator over its chunks, so several LLM requests are in flight
+    while earlier ones are still being written to the page.
+    """
+    chunks = queue.Queue()
+
+    def produce():
+        try:
+            for chunk in make_stream():
+                chunks.put(chunk)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_STREAM_DONE)
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    def consume():
+        while True:
+            item = chunks.get()
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    return consume()
+
+
+def render_report(report):
+    """
+    A finished report dict (cached or multi-role).
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("ATS Score", report["ats_score"])
+    with col2:
+        st.metric("Role Readiness Score", report["role_readiness_score"])
+
+    st.subheader("❌ Why You May Be Rejected")
+    st.write(report["rejection_explanation"])
+
+    st.subheader("✅ Strengths Detected")
+    st.write(report["strengths_summary"])
+
+    st.subheader("⚠️ ATS Diagnostics")
+    st.write(report["ats_diagnostics"])
+
+    st.subheader("📉 Missing Core Expectations")
+    st.write(", ".join(report["missing_core_expectations"]) or "None")
+
+    st.subheader("📉 Weak Signals")
+    st.write(", ".join(report["weak_signals"]) or "None")
+
+    st.subheader("🛠️ How to Improve (What + Where + How)")
+    if report["how_to_improve"]:
+        for item in report["how_to_improve"]:
+            with st.expander(item["issue"]):
+                st.write(f"**Section to update:** {item['section_to_update']}")
+                st.write(f"**What to add:** {item['what_to_add']}")
+                st.write("**Safe example wording:**")
+                for ex in item["example_wording"]:
+                    st.markdown(f"- {ex}")
+    else:
+        st.write("No critical improvements required.")
+
+    st.subheader("✍️ Sample Bullet Rewrites")
+    for b in report["sample_bullet_rewrites"]:
+        st.markdown(f"- {b}")
+
+
+def render_multi_role(result):
+    """
+    One tab per role of a generate_multi_role_report result.
+    """
+    st.subheader("📊 Role Comparison")
+    st.write(" > ".join(result["ranking"]))
+
+    tabs = st.tabs(result["target_roles"])
+    for tab, role in zip(tabs, result["target_roles"]):
+        with tab:
+            render_report(result["reports"][role])
+
+
 # ---------------------------------
 # PROCESS
 # ---------------------------------
@@ -43,20 +156,90 @@ if analyze_btn:
         st.error("Please upload a resume and enter a target role.")
         st.stop()
 
-    with st.spinner("Analyzing resume..."):
+    extra_roles = [r.strip() for r in compare_roles.split(",") if r.strip()]
+
+    if extra_roles:
+        # Multi-role view: one parse, every role scored from the same
+        # features, LLM sections for all roles batched into few requests.
+        with st.spinner("Analyzing resume for every role..."):
+            try:
+                result = generate_multi_role_report(
+                    pdf_path=uploaded_file,
+                    target_roles=[target_role] + extra_roles,
+                    sandbox=True
+                )
+            except PdfParseError as e:
+                st.error(f"Could not read this PDF ({e.code}): {e.detail}")
+                st.stop()
+
+        st.success("Analysis complete")
+        st.divider()
+
+        st.subheader("🎯 Best Fit Roles")
+        first = result["reports"][result["target_roles"][0]]
+        st.write(", ".join(first["recommended_roles"]))
+
+        st.divider()
+        render_multi_role(result)
+        st.stop()
 
-        # Save uploaded PDF temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(uploaded_file.read())
-            tmp_path = tmp.name
+    # Repeat analyses of the same PDF and role come from the report cache.
+    pdf_data = read_pdf_bytes(uploaded_file)
+    pdf_sha = pdf_sha256(pdf_data)
 
+    cached = cached_report(pdf_sha, target_role, "sections")
+    if cached is not None:
+        st.success("Analysis complete")
+        st.divider()
+
+        st.subheader("🎯 Best Fit Roles")
+        st.write(", ".join(cached["recommended_roles"]))
+
+        st.divider()
+        render_report(cached)
+        st.stop()
+
+    with st.spinner("Analyzing resume..."):
+
+        # Parsed straight from the upload buffer — no temp file — in a
+        # resource-limited worker. Deterministic stages only; LLM
+        # sections stream in below.
         try:
-            report = generate_final_report(
-                pdf_path=tmp_path,
-                target_role=target_role
+            analysis = analyze_resume(
+                pdf_path=pdf_data,
+                target_role=target_role,
+                sandbox=True
             )
-        finally:
-            os.remove(tmp_path)
+        except PdfParseError as e:
+            st.error(f"Could not read this PDF ({e.code}): {e.detail}")
+            st.stop()
+
+    evaluation = analysis["evaluation"]
+    diagnostics = analysis["diagnostics"]
+
+    # All four LLM requests start now and run concurrently; each stream
+    # is written into its container below as it arrives.
+    rejection_stream = stream_in_background(lambda: stream_rejection(
+        score=analysis["score"],
+        reasons=analysis["reasons"],
+        diagnostics=diagnostics,
+        target_role=target_role
+    ))
+    strengths_stream = stream_in_background(lambda: stream_strengths(
+        diagnostics=diagnostics,
+        target_role=target_role
+    ))
+    ats_stream = stream_in_background(lambda: stream_ats_diagnostics(
+        diagnostics=diagnostics,
+        target_role=target_role
+    ))
+    rewrite_pool = ThreadPoolExecutor(max_workers=1)
+    rewrites_future = rewrite_pool.submit(
+        rewrite_resume_bullets,
+        analysis["project_bullets"],
+        target_role
+    )
+    rewrite_pool.shutdown(wait=False)
 
     st.success("Analysis complete")
     st.divider()
@@ -67,10 +250,10 @@ if analyze_btn:
     col1, col2 = st.columns(2)
 
     with col1:
-        st.metric("ATS Score", report["ats_score"])
+        st.metric("ATS Score", evaluation["ats_score"])
 
     with col2:
-        st.metric("Role Readiness Score", report["role_readiness_score"])
+        st.metric("Role Readiness Score", evaluation["role_readiness_score"])
 
     st.divider()
 
@@ -78,21 +261,21 @@ if analyze_btn:
     # ROLE FIT
     # ---------------------------------
     st.subheader("🎯 Best Fit Roles")
-    st.write(", ".join(report["recommended_roles"]))
+    st.write(", ".join(evaluation["recommended_roles"]))
 
     st.divider()
 
     # ---------------------------------
-    # EXPLANATIONS
+    # EXPLANATIONS (filled after the deterministic sections render)
     # ---------------------------------
     st.subheader("❌ Why You May Be Rejected")
-    st.write(report["rejection_explanation"])
+    rejection_box = st.container()
 
     st.subheader("✅ Strengths Detected")
-    st.write(report["strengths_summary"])
+    strengths_box = st.container()
 
     st.subheader("⚠️ ATS Diagnostics")
-    st.write(report["ats_diagnostics"])
+    ats_box = st.container()
 
     st.divider()
 
@@ -100,14 +283,14 @@ if analyze_btn:
     # GAPS
     # ---------------------------------
     st.subheader("📉 Missing Core Expectations")
-    if report["missing_core_expectations"]:
-        st.write(", ".join(report["missing_core_expectations"]))
+    if diagnostics["missing_must_have"]:
+        st.write(", ".join(diagnostics["missing_must_have"]))
     else:
         st.write("None")
 
     st.subheader("📉 Weak Signals")
-    if report["weak_signals"]:
-        st.write(", ".join(report["weak_signals"]))
+    if diagnostics["weak_signals"]:
+        st.write(", ".join(diagnostics["weak_signals"]))
     else:
         st.write("None")
 
@@ -118,8 +301,8 @@ if analyze_btn:
     # ---------------------------------
     st.subheader("🛠️ How to Improve (What + Where + How)")
 
-    if report["how_to_improve"]:
-        for item in report["how_to_improve"]:
+    if analysis["improvements"]:
+        for item in analysis["improvements"]:
             with st.expander(item["issue"]):
                 st.write(f"**Section to update:** {item['section_to_update']}")
                 st.write(f"**What to add:** {item['what_to_add']}")
@@ -135,5 +318,37 @@ if analyze_btn:
     # REWRITES
     # ---------------------------------
     st.subheader("✍️ Sample Bullet Rewrites")
-    for b in report["sample_bullet_rewrites"]:
-        st.markdown(f"- {b}")
+    rewrites_box = st.container()
+
+    # ---------------------------------
+    # STREAM LLM SECTIONS
+    # ---------------------------------
+    with rejection_box:
+        rejection_explanation = st.write_stream(rejection_stream)
+
+    with strengths_box:
+        strengths_summary = st.write_stream(strengths_stream)
+
+    with ats_box:
+        ats_diagnostics = st.write_stream(ats_stream)
+
+    with rewrites_box:
+        with st.spinner("Rewriting bullets..."):
+            rewrites = rewrites_future.result()
+        if not analysis["project_bullets"]:
+            rewrites = [NO_REWRITE_TEXT]
+
+        for b in rewrites:
+            st.markdown(f"- {b}")
+
+    cache_report(
+        pdf_sha,
+        build_report(
+            analysis,
+            rejection_explanation=rejection_explanation,
+            strengths_summary=strengths_summary,
+            ats_diagnostics=ats_diagnostics,
+            rewritten_bullets=rewrites
+        ),
+        "sections"
+    )
@@ -0,0 +1,295 @@
+# batch_runner.py
+#
+# Bulk report generation:
+#
+#     python -m report_generator batch resumes/ "inbox/*.pdf" \
+#         --role "ML Engineer" --role "Backend Engineer" \
+#         --out reports.jsonl [--mode sections] [--workers 4]
+#
+# Parsing and scoring fan out across a process pool; LLM stages run on
+# the event loop behind a semaphore. One JSON line is written per
+# (PDF, role) as soon as its report is ready. Finished jobs are recorded
+# in a checkpoint file (default: <out>.ckpt), so re-running the same
+# command after an interruption skips them and appends to the output.
+
+import argparse
+import asyncio
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, IO, Iterable, List, Optional, Set, Tuple
+
+from report_generator import (
+    REPORT_MODES,
+    agenerate_explanations,
+    analyze_roles,
+    build_report
+)
+import resume_parser
+from llm_backends import aclose_async_http_client
+from resume_parser import pdf_sha256, read_pdf_bytes
+
+STAGES = ("analyze", "llm", "total")
+
+
+# --------------------------------------------------
+# INPUTS
+# --------------------------------------------------
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """
+    PDF paths from files, directories and glob patterns, de-duplicated,
+    in a stable order.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [
+                os.path.join(pattern, name)
+                for name in sorted(os.listdir(pattern))
+                if name.lower().endswith(".pdf")
+            ]
+        else:
+            matches = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def job_key(sha: str, role: str) -> str:
+    return f"{sha}\t{role}"
+
+
+def load_checkpoint(path: Optional[str]) -> Set[str]:
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+# --------------------------------------------------
+# WORKER (RUNS IN THE PROCESS POOL)
+# --------------------------------------------------
+
+def _init_worker() -> None:
+    # The batch pool already spreads PDFs across cores; sharding pages
+    # inside each worker as well would start workers × PDF_WORKERS processes.
+    resume_parser.PDF_WORKERS = 1
+
+
+def _analyze_job(
+    pdf_path: str,
+    roles: List[str]
+) -> Tuple[List[Dict[str, object]], float]:
+    """
+    (analysis per role, seconds). All roles of a PDF run in one worker
+    through analyze_roles, so parsing and feature extraction happen once.
+    """
+    start = time.perf_counter()
+    analyses = analyze_roles(pdf_path, roles)
+    return analyses, time.perf_counter() - start
+
+
+# --------------------------------------------------
+# PIPELINE
+# --------------------------------------------------
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile; 0.0 for no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class BatchRun:
+
+    def __init__(
+        self,
+        out: IO[str],
+        checkpoint: Optional[IO[str]],
+        mode: str,
+        workers: int,
+        llm_concurrency: int
+    ):
+        self.out = out
+        self.checkpoint = checkpoint
+        self.mode = mode
+        self.workers = workers
+        self.llm_concurrency = llm_concurrency
+        self.timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.done = 0
+        self.errors = 0
+
+    def _emit(self, record: Dict[str, object], key: Optional[str]) -> None:
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+        if key is not None and self.checkpoint is not None:
+            self.checkpoint.write(key + "\n")
+            self.checkpoint.flush()
+
+    def _fail(self, record: Dict[str, object], error: Exception) -> None:
+        self.errors += 1
+        record["error"] = f"{type(error).__name__}: {error}"
+        self._emit(record, key=None)
+
+    async def _run_role(
+        self,
+        record: Dict[str, object],
+        analysis: Dict[str, object],
+        analyze_seconds: float,
+        start: float
+    ) -> None:
+        try:
+            llm_start = time.perf_counter()
+            async with self.llm_limit:
+                explanations = await agenerate_explanations(analysis, self.mode)
+            llm_seconds = time.perf_counter() - llm_start
+
+            record["report"] = build_report(analysis, *explanations)
+        except Exception as e:
+            self._fail(record, e)
+            return
+
+        total_seconds = time.perf_counter() - start
+        self.timings["analyze"].append(analyze_seconds)
+        self.timings["llm"].append(llm_seconds)
+        self.timings["total"].append(total_seconds)
+        record["timings"] = {
+            "analyze": round(analyze_seconds, 4),
+            "llm": round(llm_seconds, 4),
+            "total": round(total_seconds, 4)
+        }
+
+        self.done += 1
+        self._emit(record, key=job_key(record["sha256"], record["target_role"]))
+
+    async def _run_pdf(
+        self,
+        pool: ProcessPoolExecutor,
+        pdf_path: str,
+        sha: str,
+        roles: List[str]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+
+        async with self.in_flight:
+            start = time.perf_counter()
+            records = [
+                {"pdf": pdf_path, "sha256": sha, "target_role": role}
+                for role in roles
+            ]
+
+            try:
+                analyses, seconds = await loop.run_in_executor(pool, _analyze_job, pdf_path, roles)
+            except Exception as e:
+                for record in records:
+                    self._fail(record, e)
+                return
+
+            # every role of the PDF shares the one analysis pass
+            await asyncio.gather(*(
+                self._run_role(record, analysis, seconds, start)
+                for record, analysis in zip(records, analyses)
+            ))
+
+    async def run(self, jobs: List[Tuple[str, str, List[str]]]) -> None:
+        # created on the running loop
+        self.llm_limit = asyncio.Semaphore(self.llm_concurrency)
+        # bounds jobs past the pool, so reports stream out as they finish
+        # instead of every analysis piling up ahead of the LLM stage
+        self.in_flight = asyncio.Semaphore(max(self.workers, self.llm_concurrency) * 2)
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+                await asyncio.gather(*(
+                    self._run_pdf(pool, pdf_path, sha, roles)
+                    for pdf_path, sha, roles in jobs
+                ))
+        finally:
+            # this loop ends with asyncio.run; release its pooled connections
+            await aclose_async_http_client()
+
+    def summary(self, skipped: int, elapsed: float) -> str:
+        parts = [
+            f"{self.done} reports",
+            f"{self.errors} errors",
+            f"{skipped} skipped",
+            f"{elapsed:.1f}s",
+            f"{self.done / elapsed if elapsed > 0 else 0.0:.2f} reports/s"
+        ]
+        for stage in STAGES:
+            values = self.timings[stage]
+            parts.append(
+                f"{stage} p50={percentile(values, 50):.3f}s p95={percentile(values, 95):.3f}s"
+            )
+        return "[batch] " + " | ".join(parts)
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m report_generator batch",
+        description="Generate reports for many PDFs and roles as JSON lines."
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("--role", dest="roles", action="append", required=True,
+                        help="target role (repeatable)")
+    parser.add_argument("--out", help="JSONL output file (default: stdout)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <out>.ckpt)")
+    parser.add_argument("--mode", choices=REPORT_MODES, default="sections")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    checkpoint_path = args.checkpoint or (args.out + ".ckpt" if args.out else None)
+    finished = load_checkpoint(checkpoint_path)
+
+    jobs = []
+    skipped = 0
+    for pdf_path in expand_inputs(args.inputs):
+        try:
+            sha = pdf_sha256(read_pdf_bytes(pdf_path))
+        except OSError as e:
+            print(f"[WARN] Skipping {pdf_path}: {e}", file=sys.stderr)
+            continue
+        roles = [role for role in args.roles if job_key(sha, role) not in finished]
+        skipped += len(args.roles) - len(roles)
+        if roles:
+            jobs.append((pdf_path, sha, roles))
+
+    out = open(args.out, "a", encoding="utf-8") if args.out else sys.stdout
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+
+    batch = BatchRun(
+        out=out,
+        checkpoint=checkpoint,
+        mode=args.mode,
+        workers=max(1, args.workers),
+        llm_concurrency=max(1, args.llm_concurrency)
+    )
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(batch.run(jobs))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        print(batch.summary(skipped, time.perf_counter() - start), file=sys.stderr)
+
+    return 1 if batch.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# batch_scoring.py
+#
+# Recruiter-side screening: score many resumes against every role profile
+# at once. Each resume becomes one row of a sparse (CSR) signal-presence
+# matrix (resumes x phrases); role scores for all (resume, role) pairs
+# then fall out of two sparse-dense products plus elementwise rules that
+# reproduce score_resume, compute_ats_score, compute_role_readiness and
+# recommend_best_roles exactly.
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from analyzer import IMPLICIT_SIGNAL_MAP, SIGNAL_MATCHER
+from evaluation_engine import MUST_HAVE_WEIGHT, STRONG_SIGNAL_WEIGHT
+from features import ResumeFeatures, extract_features
+from role_profiles import COMPILED_PROFILES, RoleProfile
+from signal_matcher import SignalMatcher
+
+# presence matrices: CSR from encode_features, or dense (e.g. FeatureStore)
+Presence = Union[sparse.csr_matrix, np.ndarray]
+
+
+# Per-resume section statistics the scoring rules read, one column each.
+STAT_COLUMNS = (
+    "skills_chars",
+    "experience_chars",
+    "projects_chars",
+    "education_chars",
+    "has_projects",
+    "projects_words",
+    "digit_count",
+)
+_COL = {name: i for i, name in enumerate(STAT_COLUMNS)}
+
+
+def signal_vocab(profiles: Dict[str, RoleProfile] = COMPILED_PROFILES) -> List[str]:
+    """
+    Every must-have / strong-signal phrase, in first-seen profile order.
+    """
+    vocab = {}
+    for profile in profiles.values():
+        for phrase in profile.must_have + profile.strong_signals:
+            vocab.setdefault(phrase, None)
+    return list(vocab)
+
+
+def vocab_matcher(vocab: Sequence[str]) -> SignalMatcher:
+    """
+    SIGNAL_MATCHER when it knows every phrase in vocab; otherwise a
+    matcher built for vocab, so phrases that exist only in custom
+    profiles are matched instead of counted as missing.
+    """
+    if SIGNAL_MATCHER.phrases.issuperset(vocab):
+        return SIGNAL_MATCHER
+    return SignalMatcher(phrases=vocab, implicit_keywords=IMPLICIT_SIGNAL_MAP)
+
+
+# --------------------------------------------------
+# ENCODING
+# --------------------------------------------------
+
+def encode_stats(features: ResumeFeatures) -> List[int]:
+    chars = features.section_chars
+    return [
+        chars.get("skills", 0),
+        chars.get("experience", 0),
+        chars.get("projects", 0),
+        chars.get("education", 0),
+        int("projects" in features.sections),
+        features.section_words.get("projects", 0),
+        features.digit_count,
+    ]
+
+
+def encode_features(
+    features_list: Sequence[ResumeFeatures],
+    vocab: Sequence[str],
+    matcher: Optional[SignalMatcher] = None
+) -> Tuple[sparse.csr_matrix, sparse.csr_matrix, np.ndarray]:
+    """
+    (signals, phrases, stats) for a batch:
+    signals[i, j] = vocab[j] found literally or implicitly (score_resume),
+    phrases[i, j] = vocab[j] found literally (recommend_best_roles),
+    stats[i] = encode_stats row.
+    With matcher, each resume's text is re-matched instead of reading
+    features.hits (see vocab_matcher).
+    """
+    column = {phrase: j for j, phrase in enumerate(vocab)}
+    n = len(features_list)
+
+    signal_hits: List[Tuple[int, int]] = []
+    phrase_hits: List[Tuple[int, int]] = []
+    stats = np.zeros((n, len(STAT_COLUMNS)), dtype=np.int64)
+
+    for i, features in enumerate(features_list):
+        hits = features.hits if matcher is None else matcher.match(features.text, lowered=True)
+        signal_hits.extend((i, column[s]) for s in hits.signals if s in column)
+        phrase_hits.extend((i, column[p]) for p in hits.phrases if p in column)
+        stats[i] = encode_stats(features)
+
+    return (
+        _presence(signal_hits, n, len(vocab)),
+        _presence(phrase_hits, n, len(vocab)),
+        stats
+    )
+
+
+def _presence(hits: List[Tuple[int, int]], n: int, width: int) -> sparse.csr_matrix:
+    rows, cols = np.array(hits, dtype=np.int64).reshape(-1, 2).T
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.uint8), (rows, cols)),
+        shape=(n, width)
+    )
+
+
+def profile_matrices(
+    profiles: Dict[str, RoleProfile],
+    vocab: Sequence[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (must, strong): vocab x roles counts of each phrase per profile list.
+    """
+    column = {phrase: j for j, phrase in enumerate(vocab)}
+    must = np.zeros((len(vocab), len(profiles)), dtype=np.int64)
+    strong = np.zeros((len(vocab), len(profiles)), dtype=np.int64)
+
+    for r, profile in enumerate(profiles.values()):
+        for phrase in profile.must_have:
+            must[column[phrase], r] += 1
+        for phrase in profile.strong_signals:
+            strong[column[phrase], r] += 1
+
+    return must, strong
+
+
+# --------------------------------------------------
+# SCORING
+# --------------------------------------------------
+
+class BatchScores(NamedTuple):
+    roles: List[str]
+    score: np.ndarray                 # (resumes, roles)  score_resume
+    missing_must_have: np.ndarray     # (resumes, roles)
+    weak_signals: np.ndarray          # (resumes, roles)
+    strengths: np.ndarray             # (resumes, roles)
+    ats_score: np.ndarray             # (resumes,)        compute_ats_score
+    role_readiness: np.ndarray        # (resumes, roles)  compute_role_readiness
+    recommended: np.ndarray           # (resumes, top_k)  role indices
+
+    def recommended_roles(self, row: int) -> List[str]:
+        return [self.roles[r] for r in self.recommended[row]]
+
+
+def score_arrays(
+    signals: Presence,
+    phrases: Presence,
+    stats: np.ndarray,
+    vocab: Sequence[str],
+    profiles: Optional[Dict[str, RoleProfile]] = None,
+    top_k: int = 3
+) -> BatchScores:
+    """
+    Scores an encoded batch (see encode_features) against all profiles.
+    Dense presence arrays are converted to CSR; products only touch the
+    stored hits, never an upcast copy of the whole matrix.
+    """
+    profiles = COMPILED_PROFILES if profiles is None else profiles
+    must, strong = profile_matrices(profiles, vocab)
+
+    signals = sparse.csr_matrix(signals)
+    phrases = sparse.csr_matrix(phrases)
+
+    present_must = signals @ must
+    present_strong = signals @ strong
+    missing = must.sum(axis=0) - present_must
+    weak = strong.sum(axis=0) - present_strong
+    strengths = present_must + present_strong
+
+    col = {name: stats[:, i:i + 1] for name, i in _COL.items()}
+
+    # score_resume
+    skills_overloaded = col["skills_chars"] > 800
+    projects_thin = (col["has_projects"] == 1) & (col["projects_words"] < 120)
+
+    score = (
+        100
+        - 12 * missing
+        - np.minimum(4 * weak, 16)
+        - 8 * skills_overloaded
+        - 6 * projects_thin
+    )
+    has_reasons = (missing > 0) | (weak > 0) | skills_overloaded | projects_thin
+    score = np.where(has_reasons & (score > 85), 78, score)
+    score = np.maximum(score, 0)
+
+    # compute_ats_score
+    ats = (
+        100
+        - 15 * (col["skills_chars"] > 900)
+        - 20 * (col["experience_chars"] == 0)
+        - 10 * (col["projects_chars"] == 0)
+        - 10 * (col["digit_count"] < 10)
+        - 5 * (col["education_chars"] == 0)
+    )
+    ats = np.maximum(ats, 40)
+
+    # compute_role_readiness
+    readiness = np.clip(
+        ats - 10 * missing - 4 * weak + np.minimum(2 * strengths, 8),
+        30,
+        95
+    )
+
+    # recommend_best_roles: stable sort on descending fit, like sorted()
+    fit = phrases @ (MUST_HAVE_WEIGHT * must + STRONG_SIGNAL_WEIGHT * strong)
+    recommended = np.argsort(-fit, axis=1, kind="stable")[:, :top_k]
+
+    return BatchScores(
+        roles=list(profiles),
+        score=score,
+        missing_must_have=missing,
+        weak_signals=weak,
+        strengths=strengths,
+        ats_score=ats[:, 0],
+        role_readiness=readiness,
+        recommended=recommended
+    )
+
+
+def score_batch(
+    features_list: Sequence[ResumeFeatures],
+    profiles: Optional[Dict[str, RoleProfile]] = None,
+    top_k: int = 3
+) -> BatchScores:
+    profiles = COMPILED_PROFILES if profiles is None else profiles
+    vocab = signal_vocab(profiles)
+    matcher = vocab_matcher(vocab)
+    signals, phrases, stats = encode_features(
+        features_list,
+        vocab,
+        matcher=None if matcher is SIGNAL_MATCHER else matcher
+    )
+    return score_arrays(signals, phrases, stats, vocab, profiles, top_k)
+
+
+def score_corpus(
+    resumes: Iterable[Tuple[str, Dict[str, str]]],
+    profiles: Optional[Dict[str, RoleProfile]] = None,
+    top_k: int = 3
+) -> BatchScores:
+    """
+    Scores parsed (resume_text, sections) pairs, e.g. from parse_resume.
+    """
+    profiles = COMPILED_PROFILES if profiles is None else profiles
+    vocab = signal_vocab(profiles)
+    matcher = vocab_matcher(vocab)
+    signals, phrases, stats = encode_features(
+        [extract_features(text, sections, matcher) for text, sections in resumes],
+        vocab
+    )
+    return score_arrays(signals, phrases, stats, vocab, profiles, top_k)
@@ -0,0 +1,95 @@
+# benchmarks/bench_split_sections.py
+#
+# Section splitting time vs. document length, legacy splitter vs. the
+# current one. Run from the repository root:
+#
+#     python benchmarks/bench_split_sections.py [--max-pages 100]
+#
+# Linear scaling shows up as a flat "us/page" column.
+
+import argparse
+import os
+import sys
+import timeit
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import SECTION_HEADERS, split_into_sections  # noqa: E402
+
+
+# One resume-like page: a few sections, mostly body lines. Every page
+# repeats the same headers, so bodies are replaced, not grown; the
+# single-section document below is the worst case for string growth.
+PAGE = "\n".join(
+    ["Jane Doe", "jane@example.com | github.com/jane"]
+    + ["Technical Skills", "Languages: Python, SQL, Go, TypeScript"]
+    + ["Professional Experience"]
+    + ["Built data pipelines processing 2M events/day with 99.9% uptime."] * 18
+    + ["Projects"]
+    + ["Trained a ranking model; improved NDCG by 12% over the baseline."] * 18
+    + ["Education", "B.Tech Computer Science, 2024"]
+)
+
+ONE_SECTION_PAGE = "\n".join(
+    [
+        "Deployed services on Kubernetes and cut p95 latency by 30%.",
+        "Mentored two interns; shared on-call experience in weekly reviews.",
+        "Owned the billing service and its migration to PostgreSQL.",
+        "Wrote runbooks that reduced incident resolution time by 25%."
+    ] * 10
+)
+
+
+def legacy_split_into_sections(text: str) -> Dict[str, str]:
+    """
+    The original splitter: substring header test, string concatenation.
+    """
+    sections = {"header": ""}
+    current = "header"
+
+    for line in text.lower().split("\n"):
+        clean = line.strip()
+        if not clean:
+            continue
+
+        for h in SECTION_HEADERS:
+            if h in clean:
+                current = h
+                sections[current] = ""
+                break
+        else:
+            sections[current] += clean + " "
+
+    return sections
+
+
+def bench(fn, text: str, repeat: int) -> float:
+    return min(timeit.repeat(lambda: fn(text), number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-pages", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    page_counts = sorted({1, 10, 25, 50, args.max_pages})
+
+    for title, page in (("resume pages", PAGE), ("single section", ONE_SECTION_PAGE)):
+        print(f"\n{title}")
+        print(f"{'pages':>6} {'chars':>9} {'legacy ms':>10} {'us/page':>8} {'current ms':>11} {'us/page':>8}")
+
+        for pages in page_counts:
+            text = "\n".join([page] * pages)
+            legacy = bench(legacy_split_into_sections, text, args.repeat)
+            current = bench(split_into_sections, text, args.repeat)
+            print(
+                f"{pages:>6} {len(text):>9} "
+                f"{legacy * 1e3:>10.2f} {legacy * 1e6 / pages:>8.0f} "
+                f"{current * 1e3:>11.2f} {current * 1e6 / pages:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# cache_store.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+# --------------------------------------------------
+# KEYS
+# --------------------------------------------------
+
+def make_key(*parts: object) -> str:
+    """
+    Content-addressed key: SHA-256 over the JSON encoding of the parts.
+    """
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------
+# IN-MEMORY TIER (BOUNDED LRU + TTL)
+# --------------------------------------------------
+
+class LRUCache:
+    """
+    Thread-safe LRU with optional per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[Optional[float], object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[object]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: object) -> None:
+        expires_at = (
+            time.time() + self.ttl_seconds
+            if self.ttl_seconds is not None
+            else None
+        )
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# --------------------------------------------------
+# PERSISTENT TIER (SQLITE, SIZE-BOUNDED)
+# --------------------------------------------------
+
+class SQLiteStore:
+    """
+    Persistent key/value tier with TTL and size-based (LRU) eviction.
+    Several namespaces can share one database file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str = "default",
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_lru "
+                "ON entries (namespace, accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[object]:
+        now = time.time()
+
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and created_at + self.ttl_seconds <= now:
+                self._conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                )
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+
+        return json.loads(value)
+
+    def set(self, key: str, value: object) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(encoded.encode("utf-8"))
+        now = time.time()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(namespace, key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, encoded, size, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND created_at <= ?",
+                (self.namespace, now - self.ttl_seconds)
+            )
+
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries WHERE namespace = ? ORDER BY accessed_at",
+            (self.namespace,)
+        ):
+            victims.append((self.namespace, key))
+            excess -= size
+            if excess <= 0:
+                break
+
+        self._conn.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?",
+            victims
+        )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM entries WHERE namespace = ?",
+                (self.namespace,)
+            )
+
+
+# --------------------------------------------------
+# TIERED CACHE (LRU IN FRONT OF OPTIONAL STORE)
+# --------------------------------------------------
+
+class TieredCache:
+    """
+    Memory LRU backed by an optional persistent store, with hit/miss counters.
+    Values must be JSON-serializable when a store is attached.
+    """
+
+    def __init__(self, memory: LRUCache, store: Optional[SQLiteStore] = None):
+        self.memory = memory
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def get(self, key: str) -> Optional[object]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def peek(self, key: str) -> Optional[object]:
+        """
+        get without touching the hit/miss counters, for re-checks of a
+        key whose miss was already counted.
+        """
+        value = self.memory.get(key)
+        if value is None and self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: object) -> None:
+        self.memory.set(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "memory_entries": len(self.memory)
+        }
+
+
+def build_cache(
+    namespace: str,
+    path: Optional[str],
+    max_entries: int = 1024,
+    max_bytes: int = 64 * 1024 * 1024,
+    ttl_seconds: Optional[float] = None
+) -> TieredCache:
+    """
+    Builds a TieredCache; an empty or missing path keeps it memory-only.
+    """
+    store = (
+        SQLiteStore(path, namespace=namespace, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        if path
+        else None
+    )
+    return TieredCache(LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds), store)
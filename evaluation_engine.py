@@ -1,40 +1,48 @@
 # evaluation_engine.py
 
-from typing import Dict, List
-from role_profiles import ROLE_PROFILES, resolve_role_profile
+import heapq
+from typing import Dict, List, Optional, Tuple
+from role_profiles import COMPILED_PROFILES, RoleProfile
+from features import ResumeFeatures, extract_features
 
 
 # --------------------------------------------------
 # ATS SCORE (GENERIC, ALL DISCIPLINES)
 # --------------------------------------------------
 
-def compute_ats_score(sections: Dict[str, str]) -> int:
+def compute_ats_score(
+    sections: Dict[str, str],
+    features: Optional[ResumeFeatures] = None
+) -> int:
     """
     Measures resume quality for ATS systems:
     formatting, clarity, quantification, structure.
     """
 
+    if features is None:
+        features = extract_features(" ".join(sections.values()), sections)
+    section_chars = features.section_chars
+
     score = 100
 
     # Skills overload
-    if len(sections.get("skills", "")) > 900:
+    if section_chars.get("skills", 0) > 900:
         score -= 15
 
     # Missing experience section
-    if not sections.get("experience"):
+    if not section_chars.get("experience"):
         score -= 20
 
     # Missing projects for technical roles
-    if not sections.get("projects"):
+    if not section_chars.get("projects"):
         score -= 10
 
     # Poor quantification
-    numbers = sum(char.isdigit() for char in " ".join(sections.values()))
-    if numbers < 10:
+    if features.digit_count < 10:
         score -= 10
 
     # Weak structure
-    if not sections.get("education"):
+    if not section_chars.get("education"):
         score -= 5
 
     return max(score, 40)
@@ -70,37 +78,67 @@ def compute_role_readiness(
 # ROLE FIT RECOMMENDATION (KEY DIFFERENTIATOR)
 # --------------------------------------------------
 
-def recommend_best_roles(
-    resume_text: str
-) -> List[str]:
+# Role-fit points per matched phrase.
+MUST_HAVE_WEIGHT = 3
+STRONG_SIGNAL_WEIGHT = 2
+
+
+def build_role_index(
+    profiles: Dict[str, RoleProfile]
+) -> Dict[str, List[Tuple[str, int]]]:
     """
-    Determines which roles the resume best aligns with.
+    Inverted index: phrase -> [(role, points)] across all profiles.
     """
+    index: Dict[str, List[Tuple[str, int]]] = {}
+    for role, profile in profiles.items():
+        for must in profile.must_have:
+            index.setdefault(must, []).append((role, MUST_HAVE_WEIGHT))
+        for strong in profile.strong_signals:
+            index.setdefault(strong, []).append((role, STRONG_SIGNAL_WEIGHT))
+    return index
+
 
-    resume_text = resume_text.lower()
-    role_scores = {}
+ROLE_INDEX = build_role_index(COMPILED_PROFILES)
 
-    for role, profile in ROLE_PROFILES.items():
-        score = 0
+# Ties are broken by profile order, as a stable sort would.
+_ROLE_ORDER = {role: i for i, role in enumerate(COMPILED_PROFILES)}
 
-        for must in profile["must_have"]:
-            if must in resume_text:
-                score += 3
 
-        for strong in profile["strong_signals"]:
-            if strong in resume_text:
-                score += 2
+def recommend_best_roles(
+    resume_text: str,
+    features: Optional[ResumeFeatures] = None,
+    top_k: int = 3
+) -> List[str]:
+    """
+    Determines which roles the resume best aligns with.
+    Only roles sharing a matched phrase are scored, so the cost depends
+    on the resume's matches rather than the number of profiles.
+    """
+
+    if features is None:
+        features = extract_features(resume_text, {})
 
-        role_scores[role] = score
+    role_scores: Dict[str, int] = {}
+    for phrase in features.hits.phrases:
+        for role, points in ROLE_INDEX.get(phrase, ()):
+            role_scores[role] = role_scores.get(role, 0) + points
 
-    # Sort roles by alignment score
-    sorted_roles = sorted(
+    best = heapq.nlargest(
+        top_k,
         role_scores.items(),
-        key=lambda x: x[1],
-        reverse=True
+        key=lambda x: (x[1], -_ROLE_ORDER[x[0]])
     )
+    roles = [role for role, _ in best]
 
-    return [r[0] for r in sorted_roles[:3]]
+    # Fewer matching roles than top_k: pad with unmatched roles in order.
+    if len(roles) < top_k:
+        for role in COMPILED_PROFILES:
+            if role not in role_scores:
+                roles.append(role)
+                if len(roles) == top_k:
+                    break
+
+    return roles
 
 
 # --------------------------------------------------
@@ -111,20 +149,24 @@ def evaluate_resume(
     resume_text: str,
     sections: Dict[str, str],
     diagnostics: Dict[str, List[str]],
-    target_role: str
+    target_role: str,
+    features: Optional[ResumeFeatures] = None
 ) -> Dict[str, object]:
     """
     Unified evaluation across ALL disciplines.
     """
 
-    ats_score = compute_ats_score(sections)
+    if features is None:
+        features = extract_features(resume_text, sections)
+
+    ats_score = compute_ats_score(sections, features=features)
 
     role_readiness = compute_role_readiness(
         diagnostics,
         base_score=ats_score
     )
 
-    recommended_roles = recommend_best_roles(resume_text)
+    recommended_roles = recommend_best_roles(resume_text, features=features)
 
     return {
         "ats_score": ats_score,
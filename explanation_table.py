@@ -0,0 +1,268 @@
+# explanation_table.py
+#
+# Precomputed strengths / ATS explanations.
+#
+# Both prompts depend only on the role and on which of the profile's
+# must_have + strong_signals were found, so every reachable combination
+# can be generated once offline:
+#
+#     python explanation_table.py build [--out explanation_table.json]
+#
+# At request time summarize_strengths / explain_ats_diagnostics look the
+# combination up here and only call the LLM for unseen ones.
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cache_store import make_key
+from role_profiles import COMPILED_PROFILES, resolve_role_key
+
+TABLE_FORMAT = 1
+TABLE_PATH = os.getenv(
+    "EXPLANATION_TABLE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "explanation_table.json")
+)
+
+_entries: Optional[Dict[str, str]] = None
+_version: Optional[str] = None
+_load_lock = threading.Lock()
+
+
+# --------------------------------------------------
+# KEYS
+# --------------------------------------------------
+
+# Titles without a profile of their own resolve to "generic"; their
+# explanations must name the real title, so that profile is never tabled.
+UNTABLED_ROLES = frozenset({"generic"})
+
+def profile_title(role_key: str) -> str:
+    """
+    Role title used in table prompts, e.g. "Machine Learning Engineer".
+    """
+    return role_key.replace("_", " ").title()
+
+
+def strengths_key(role_key: str, strengths: List[str]) -> str:
+    return "|".join(["strengths", role_key, ",".join(strengths)])
+
+
+def ats_key(role_key: str, missing: List[str], weak: List[str]) -> str:
+    return "|".join(["ats", role_key, ",".join(missing), ",".join(weak)])
+
+
+# --------------------------------------------------
+# LOOKUP (REQUEST TIME)
+# --------------------------------------------------
+
+def _load() -> Dict[str, str]:
+    """
+    Loads the table once; a missing file or a table built for another
+    prompt version / model is treated as empty.
+    """
+    global _entries, _version
+    if _entries is not None:
+        return _entries
+
+    with _load_lock:
+        if _entries is not None:
+            return _entries
+
+        from llm_engine import MODEL_NAME, PROMPT_VERSION
+
+        entries = {}
+        try:
+            with open(TABLE_PATH, encoding="utf-8") as f:
+                table = json.load(f)
+            if (
+                table.get("format") == TABLE_FORMAT
+                and table.get("prompt_version") == PROMPT_VERSION
+                and table.get("model") == MODEL_NAME
+            ):
+                entries = table.get("entries", {})
+        except (OSError, ValueError):
+            pass
+
+        _version = make_key(entries)
+        _entries = entries
+        return _entries
+
+
+def table_version() -> str:
+    """
+    Content hash of the loaded entries; changes when the table is rebuilt.
+    """
+    _load()
+    return _version
+
+
+def reload_table() -> None:
+    global _entries
+    _entries = None
+
+
+def lookup_strengths(
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> Optional[str]:
+    role_key = resolve_role_key(target_role)
+    if role_key in UNTABLED_ROLES:
+        return None
+    key = strengths_key(role_key, diagnostics.get("strengths", []))
+    return _load().get(key)
+
+
+def lookup_ats(
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> Optional[str]:
+    role_key = resolve_role_key(target_role)
+    if role_key in UNTABLED_ROLES:
+        return None
+    key = ats_key(
+        role_key,
+        diagnostics.get("missing_must_have", []),
+        diagnostics.get("weak_signals", [])
+    )
+    return _load().get(key)
+
+
+# --------------------------------------------------
+# BUILD (OFFLINE)
+# --------------------------------------------------
+
+def reachable_diagnostics(role_key: str) -> Iterator[Dict[str, List[str]]]:
+    """
+    Every diagnostics dict score_resume can produce for a profile:
+    each must-have is a strength or missing, each strong signal is a
+    strength or weak. List order follows score_resume.
+    """
+    profile = COMPILED_PROFILES[role_key]
+    must_have = profile.must_have
+    strong_signals = profile.strong_signals
+
+    for must_hits in itertools.product((True, False), repeat=len(must_have)):
+        for strong_hits in itertools.product((True, False), repeat=len(strong_signals)):
+            yield {
+                "missing_must_have": [
+                    m for m, hit in zip(must_have, must_hits) if not hit
+                ],
+                "weak_signals": [
+                    s for s, hit in zip(strong_signals, strong_hits) if not hit
+                ],
+                "strengths": (
+                    [m for m, hit in zip(must_have, must_hits) if hit]
+                    + [s for s, hit in zip(strong_signals, strong_hits) if hit]
+                )
+            }
+
+
+def _pending_prompts() -> Dict[str, str]:
+    """
+    key -> prompt for every entry the table should hold.
+    """
+    from llm_engine import _ats_prompt, _strengths_prompt
+
+    pending = {}
+    for role_key in COMPILED_PROFILES:
+        if role_key in UNTABLED_ROLES:
+            continue
+        title = profile_title(role_key)
+
+        for diagnostics in reachable_diagnostics(role_key):
+            strengths = diagnostics["strengths"]
+            if strengths:
+                pending[strengths_key(role_key, strengths)] = (
+                    _strengths_prompt(strengths, title)
+                )
+
+            pending[ats_key(
+                role_key,
+                diagnostics["missing_must_have"],
+                diagnostics["weak_signals"]
+            )] = _ats_prompt(diagnostics, title)
+
+    return pending
+
+
+async def _generate(
+    pending: Dict[str, str],
+    concurrency: int
+) -> Dict[str, str]:
+    from llm_backends import aclose_async_http_client
+    from llm_engine import SYSTEM_RECRUITER, acall_llm
+
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def one(key: str, prompt: str) -> Tuple[str, str]:
+        async with limiter:
+            return key, await acall_llm(SYSTEM_RECRUITER, prompt)
+
+    try:
+        results = await asyncio.gather(
+            *(one(key, prompt) for key, prompt in pending.items())
+        )
+    finally:
+        await aclose_async_http_client()
+    return dict(results)
+
+
+def build_table(out_path: str, concurrency: int = 8) -> int:
+    """
+    Generates the table, reusing entries from an existing compatible file.
+    Returns the number of entries written.
+    """
+    from llm_engine import MODEL_NAME, PROMPT_VERSION
+
+    global TABLE_PATH
+    TABLE_PATH = out_path
+    reload_table()
+    existing = _load()
+
+    pending = _pending_prompts()
+    missing = {k: v for k, v in pending.items() if k not in existing}
+
+    entries = {k: existing[k] for k in pending if k in existing}
+    entries.update(asyncio.run(_generate(missing, concurrency)))
+
+    table = {
+        "format": TABLE_FORMAT,
+        "prompt_version": PROMPT_VERSION,
+        "model": MODEL_NAME,
+        "entries": dict(sorted(entries.items()))
+    }
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, out_path)
+
+    reload_table()
+    return len(entries)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Precompute strengths / ATS explanations per role profile."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="generate the explanation table")
+    build.add_argument("--out", default=TABLE_PATH)
+    build.add_argument("--concurrency", type=int, default=8)
+
+    sub.add_parser("count", help="print how many entries a build needs")
+
+    args = parser.parse_args()
+
+    if args.command == "count":
+        print(len(_pending_prompts()))
+    else:
+        written = build_table(args.out, concurrency=args.concurrency)
+        print(f"Wrote {written} entries to {args.out}")
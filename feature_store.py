@@ -0,0 +1,304 @@
+# feature_store.py
+#
+# Persistent, memory-mapped resume features for corpus re-scoring.
+#
+# Ingesting a corpus parses each PDF once and stores, per resume row:
+#
+#     signals.npy   uint8  rows x vocab   semantic signal presence
+#     phrases.npy   uint8  rows x vocab   literal phrase presence
+#     stats.npy     int64  rows x STAT_COLUMNS
+#     offsets.npy   int64  rows + 1       slices of texts.bin
+#     texts.bin     lowercased resume texts, UTF-8, back to back
+#     index.json    vocab, row count and PDF SHA-256 -> row
+#
+# Re-scoring after a profile or weight change reads the arrays through
+# mmap without parsing anything; phrases a new profile introduces are
+# scanned once in texts.bin and appended as new columns.
+#
+#     python feature_store.py ingest resumes/ [--store .cache/features]
+#     python feature_store.py rescore [--store .cache/features]
+
+import argparse
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from analyzer import IMPLICIT_SIGNAL_MAP
+from batch_scoring import (
+    STAT_COLUMNS,
+    BatchScores,
+    encode_features,
+    score_arrays,
+    signal_vocab,
+    vocab_matcher
+)
+from features import extract_features
+from resume_parser import PARSER_VERSION, parse_resume, pdf_sha256, read_pdf_bytes
+from role_profiles import COMPILED_PROFILES, RoleProfile
+from signal_matcher import SignalMatcher
+
+STORE_FORMAT = 1
+STORE_PATH = os.getenv("FEATURE_STORE_PATH", os.path.join(".cache", "features"))
+
+
+def _write_array(path: str, array: np.ndarray) -> None:
+    """
+    Writes array as a .npy file, atomically replacing path.
+    """
+    tmp_path = path + ".tmp"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=array.dtype, shape=array.shape)
+    out[...] = array
+    out.flush()
+    del out
+    os.replace(tmp_path, path)
+
+
+class FeatureStore:
+    """
+    On-disk feature arrays for a resume corpus. index.json is written last
+    and its row count is authoritative, so an interrupted ingest leaves
+    the previous state readable. A store written by another
+    PARSER_VERSION or format is treated as empty.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self.vocab: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        try:
+            with open(self._file("index.json"), encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+
+        if (
+            index.get("format") == STORE_FORMAT
+            and index.get("parser_version") == PARSER_VERSION
+            and index.get("stat_columns") == list(STAT_COLUMNS)
+        ):
+            self.vocab = index["vocab"]
+            self.rows = index["rows"]
+        else:
+            self.vocab, self.rows = [], {}
+
+        n = len(self.rows)
+        if n:
+            self.signals = np.load(self._file("signals.npy"), mmap_mode="r")[:n]
+            self.phrases = np.load(self._file("phrases.npy"), mmap_mode="r")[:n]
+            self.stats = np.load(self._file("stats.npy"), mmap_mode="r")[:n]
+            self.offsets = np.load(self._file("offsets.npy"), mmap_mode="r")[:n + 1]
+        else:
+            self.signals = np.zeros((0, len(self.vocab)), dtype=np.uint8)
+            self.phrases = np.zeros((0, len(self.vocab)), dtype=np.uint8)
+            self.stats = np.zeros((0, len(STAT_COLUMNS)), dtype=np.int64)
+            self.offsets = np.zeros(1, dtype=np.int64)
+
+    def _commit(
+        self,
+        signals: np.ndarray,
+        phrases: np.ndarray,
+        stats: np.ndarray,
+        offsets: np.ndarray
+    ) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        _write_array(self._file("signals.npy"), signals)
+        _write_array(self._file("phrases.npy"), phrases)
+        _write_array(self._file("stats.npy"), stats)
+        _write_array(self._file("offsets.npy"), offsets)
+
+        index = {
+            "format": STORE_FORMAT,
+            "parser_version": PARSER_VERSION,
+            "stat_columns": list(STAT_COLUMNS),
+            "vocab": self.vocab,
+            "rows": self.rows
+        }
+        tmp_path = self._file("index.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._file("index.json"))
+
+        self._load()
+
+    # --------------------------------------------------
+    # INGEST
+    # --------------------------------------------------
+
+    def ingest(self, pdf_paths: Iterable[str]) -> int:
+        """
+        Parses PDFs whose content is not stored yet and appends their rows.
+        Returns the number of rows added.
+        """
+        if not self.vocab:
+            self.vocab = signal_vocab()
+            self.signals = np.zeros((0, len(self.vocab)), dtype=np.uint8)
+            self.phrases = np.zeros((0, len(self.vocab)), dtype=np.uint8)
+
+        # the vocab may include phrases added for custom profiles
+        matcher = vocab_matcher(self.vocab)
+        batch = []
+        texts = []
+        new_rows: Dict[str, int] = {}
+
+        for pdf_path in pdf_paths:
+            data = read_pdf_bytes(pdf_path)
+            sha = pdf_sha256(data)
+            if sha in self.rows or sha in new_rows:
+                continue
+
+            try:
+                resume_text, sections = parse_resume(data)
+            except Exception as e:
+                print(f"[WARN] Skipping {pdf_path}: {e}")
+                continue
+
+            features = extract_features(resume_text, sections, matcher)
+            new_rows[sha] = len(self.rows) + len(batch)
+            batch.append(features)
+            texts.append(features.text.encode("utf-8"))
+
+        if not batch:
+            return 0
+
+        signals, phrases, stats = encode_features(batch, self.vocab)
+        # stored dense (uint8) so rows can be memory-mapped
+        signals, phrases = signals.toarray(), phrases.toarray()
+
+        # texts.bin is append-only; offsets decide what is valid.
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file("texts.bin"), "ab") as f:
+            f.truncate(int(self.offsets[-1]))
+            for text in texts:
+                f.write(text)
+
+        lengths = np.array([len(t) for t in texts], dtype=np.int64)
+        offsets = np.concatenate([self.offsets, self.offsets[-1] + np.cumsum(lengths)])
+
+        self.rows = {**self.rows, **new_rows}
+        self._commit(
+            np.concatenate([self.signals, signals]),
+            np.concatenate([self.phrases, phrases]),
+            np.concatenate([self.stats, stats]),
+            offsets
+        )
+        return len(batch)
+
+    # --------------------------------------------------
+    # NEW KEYWORDS
+    # --------------------------------------------------
+
+    def iter_texts(self) -> Iterable[str]:
+        """
+        Stored lowercased resume texts, in row order.
+        """
+        if not self.rows:
+            return
+        blob = np.memmap(self._file("texts.bin"), dtype=np.uint8, mode="r")
+        offsets = self.offsets
+        for i in range(len(self.rows)):
+            yield bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def add_phrases(self, phrases: Sequence[str]) -> int:
+        """
+        Appends columns for phrases not in the vocabulary, scanning only
+        the stored texts for them. Returns the number of columns added.
+        """
+        new = [p for p in dict.fromkeys(phrases) if p not in self.vocab]
+        if not new:
+            return 0
+
+        self.vocab = self.vocab + new
+        if not self.rows:
+            self.signals = np.zeros((0, len(self.vocab)), dtype=np.uint8)
+            self.phrases = np.zeros((0, len(self.vocab)), dtype=np.uint8)
+            return len(new)
+
+        matcher = SignalMatcher(
+            phrases=new,
+            implicit_keywords={s: k for s, k in IMPLICIT_SIGNAL_MAP.items() if s in new}
+        )
+        column = {phrase: j for j, phrase in enumerate(new)}
+        new_signals = np.zeros((len(self.rows), len(new)), dtype=np.uint8)
+        new_phrases = np.zeros((len(self.rows), len(new)), dtype=np.uint8)
+
+        for i, text in enumerate(self.iter_texts()):
+            hits = matcher.match(text, lowered=True)
+            for phrase in hits.signals:
+                if phrase in column:
+                    new_signals[i, column[phrase]] = 1
+            for phrase in hits.phrases:
+                new_phrases[i, column[phrase]] = 1
+
+        self._commit(
+            np.concatenate([self.signals, new_signals], axis=1),
+            np.concatenate([self.phrases, new_phrases], axis=1),
+            np.asarray(self.stats),
+            np.asarray(self.offsets)
+        )
+        return len(new)
+
+    # --------------------------------------------------
+    # RE-SCORING (NO PARSING)
+    # --------------------------------------------------
+
+    def rescore(
+        self,
+        profiles: Optional[Dict[str, RoleProfile]] = None,
+        top_k: int = 3
+    ) -> BatchScores:
+        """
+        Scores every stored resume against profiles straight from the
+        memory-mapped arrays. Phrases the stored vocab lacks are scanned
+        in first.
+        """
+        profiles = COMPILED_PROFILES if profiles is None else profiles
+        self.add_phrases(signal_vocab(profiles))
+        return score_arrays(
+            self.signals, self.phrases, self.stats, self.vocab, profiles, top_k
+        )
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Memory-mapped resume feature store."
+    )
+    parser.add_argument("--store", default=STORE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="parse PDFs into the store")
+    ingest.add_argument("paths", nargs="+", help="PDF files or directories")
+
+    sub.add_parser("rescore", help="score the stored corpus against all profiles")
+
+    args = parser.parse_args()
+    store = FeatureStore(args.store)
+
+    if args.command == "ingest":
+        pdfs = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                pdfs.extend(
+                    os.path.join(path, name)
+                    for name in sorted(os.listdir(path))
+                    if name.lower().endswith(".pdf")
+                )
+            else:
+                pdfs.append(path)
+        added = store.ingest(pdfs)
+        print(f"Added {added} resumes ({len(store)} stored) to {args.store}")
+    else:
+        scores = store.rescore()
+        for role, mean in zip(scores.roles, scores.score.mean(axis=0)):
+            print(f"{role:<28} mean score {mean:6.1f}")
@@ -0,0 +1,76 @@
+# features.py
+#
+# Per-request resume features, computed once right after parsing and
+# shared by the scoring, evaluation and report stages so the resume text
+# is scanned once instead of once per engine.
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from analyzer import SIGNAL_MATCHER
+from signal_matcher import SignalHits, SignalMatcher
+
+
+# A number followed by a unit of impact: "30%", "2x", "10k", "150ms", "5+".
+METRIC_PATTERN = re.compile(r"\d[\d,.]*\s?(?:%|x\b|k\b|m\b|b\b|ms\b|s\b|\+)")
+
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def count_digits(text: str) -> int:
+    """
+    Same count as sum(ch.isdigit() for ch in text): ASCII digits via ten
+    C-level str.count scans, and only the (few) non-ASCII characters
+    checked one by one.
+    """
+    count = sum(text.count(d) for d in "0123456789")
+    if not text.isascii():
+        count += sum(map(str.isdigit, _NON_ASCII.findall(text)))
+    return count
+
+
+@dataclass(frozen=True)
+class ResumeFeatures:
+    """
+    Everything the deterministic engines read from a resume.
+    """
+
+    __slots__ = (
+        "text", "sections", "section_chars", "section_words",
+        "digit_count", "percent_count", "metric_count", "hits"
+    )
+
+    text: str                       # lowercased resume text
+    sections: Dict[str, str]
+    section_chars: Dict[str, int]
+    section_words: Dict[str, int]
+    digit_count: int                # digits across all sections
+    percent_count: int
+    metric_count: int               # quantified results (METRIC_PATTERN)
+    hits: SignalHits
+
+
+def extract_features(
+    resume_text: str,
+    sections: Dict[str, str],
+    matcher: Optional[SignalMatcher] = None
+) -> ResumeFeatures:
+    """
+    matcher defaults to SIGNAL_MATCHER (every built-in profile phrase);
+    pass another one to match phrases of custom profiles.
+    """
+    text = resume_text.lower()
+    matcher = SIGNAL_MATCHER if matcher is None else matcher
+
+    return ResumeFeatures(
+        text=text,
+        sections=sections,
+        section_chars={name: len(body) for name, body in sections.items()},
+        section_words={name: len(body.split()) for name, body in sections.items()},
+        digit_count=sum(count_digits(body) for body in sections.values()),
+        percent_count=text.count("%"),
+        metric_count=len(METRIC_PATTERN.findall(text)),
+        hits=matcher.match(text, lowered=True)
+    )
@@ -1,7 +1,6 @@
 # improvement_engine.py
 
 from typing import Dict, List
-from role_profiles import resolve_role_profile
 
 
 # --------------------------------------------------
@@ -126,7 +125,6 @@ def generate_improvements(
     Generates precise, safe improvement suggestions.
     """
 
-    profile = resolve_role_profile(target_role)
     suggestions = []
 
     # Missing must-have signals
@@ -0,0 +1,502 @@
+# llm_backends.py
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+
+# --------------------------------------------------
+# ERRORS
+# --------------------------------------------------
+
+class LLMError(Exception):
+    """
+    Non-retryable provider failure (bad request, auth, deadline exceeded).
+    """
+
+
+class RetryableLLMError(LLMError):
+    """
+    Transient failure: 429, 5xx, timeouts and connection errors.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_after(headers) -> Optional[float]:
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# --------------------------------------------------
+# RETRY / BACKOFF (JITTERED EXPONENTIAL, DEADLINE-BOUND)
+# --------------------------------------------------
+
+MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", 4))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Full-jitter exponential backoff; a server Retry-After is a lower bound.
+    """
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _remaining(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise LLMError("LLM call exceeded its deadline")
+    return remaining
+
+
+def call_with_retries(fn: Callable[[float], str], timeout: float) -> str:
+    """
+    Runs fn(remaining_seconds), retrying transient errors until the deadline.
+    """
+    deadline = time.monotonic() + timeout
+
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return fn(_remaining(deadline))
+        except RetryableLLMError as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = backoff_delay(attempt, e.retry_after)
+            if time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+
+    raise LLMError("unreachable")
+
+
+async def acall_with_retries(fn, timeout: float) -> str:
+    deadline = time.monotonic() + timeout
+
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return await asyncio.wait_for(fn(_remaining(deadline)), _remaining(deadline))
+        except asyncio.TimeoutError:
+            raise LLMError("LLM call exceeded its deadline")
+        except RetryableLLMError as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = backoff_delay(attempt, e.retry_after)
+            if time.monotonic() + delay >= deadline:
+                raise
+            await asyncio.sleep(delay)
+
+    raise LLMError("unreachable")
+
+
+def stream_with_retries(
+    fn: Callable[[float], Iterator[str]],
+    timeout: float
+) -> Iterator[str]:
+    """
+    Retries only until the first chunk is delivered; a stream that fails
+    midway cannot be replayed without duplicating text.
+    """
+    deadline = time.monotonic() + timeout
+
+    for attempt in range(MAX_ATTEMPTS):
+        started = False
+        try:
+            for chunk in fn(_remaining(deadline)):
+                started = True
+                yield chunk
+            return
+        except RetryableLLMError as e:
+            if started or attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = backoff_delay(attempt, e.retry_after)
+            if time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+
+
+# --------------------------------------------------
+# SHARED POOLED HTTP TRANSPORT
+# --------------------------------------------------
+# One keep-alive pool per process (sync) and per event loop (async),
+# shared by every HTTP backend.
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", 10))
+
+_http_client = None
+_async_http_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_http_lock = threading.Lock()
+
+
+def _http_limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE
+    )
+
+
+def shared_http_client():
+    global _http_client
+    if _http_client is None:
+        with _http_lock:
+            if _http_client is None:
+                import httpx
+                _http_client = httpx.Client(limits=_http_limits())
+    return _http_client
+
+
+def shared_async_http_client():
+    loop = asyncio.get_running_loop()
+    http_client = _async_http_clients.get(loop)
+    if http_client is None:
+        import httpx
+        http_client = httpx.AsyncClient(limits=_http_limits())
+        _async_http_clients[loop] = http_client
+    return http_client
+
+
+async def aclose_async_http_client() -> None:
+    """
+    Closes the running loop's pooled client; call before a short-lived
+    loop (e.g. one asyncio.run) ends.
+    """
+    http_client = _async_http_clients.pop(asyncio.get_running_loop(), None)
+    if http_client is not None:
+        await http_client.aclose()
+
+
+# --------------------------------------------------
+# SHARED EVENT LOOP (BLOCKING CALLERS)
+# --------------------------------------------------
+# Blocking entry points run their coroutines on one long-lived loop in a
+# daemon thread, so the per-loop async pools above are reused across
+# calls instead of being rebuilt (and leaked) by every asyncio.run.
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    global _background_loop
+    if _background_loop is None:
+        with _http_lock:
+            if _background_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="llm-event-loop",
+                    daemon=True
+                ).start()
+                _background_loop = loop
+    return _background_loop
+
+
+def run_sync(coro):
+    """
+    Runs coro on the shared loop and blocks for its result. Safe to call
+    from any thread, including one that runs its own event loop.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, background_loop()).result()
+
+
+# --------------------------------------------------
+# BACKEND INTERFACE
+# --------------------------------------------------
+
+class LLMBackend:
+    """
+    A chat-completion provider. `request` is an OpenAI-style body
+    (model, messages, temperature, max_tokens, optional response_format).
+    Implementations raise RetryableLLMError for transient failures;
+    retries and deadlines are applied by the caller.
+    """
+
+    name = "base"
+
+    def complete(self, request: Dict[str, object], timeout: float) -> str:
+        raise NotImplementedError
+
+    async def acomplete(self, request: Dict[str, object], timeout: float) -> str:
+        raise NotImplementedError
+
+    def stream(self, request: Dict[str, object], timeout: float) -> Iterator[str]:
+        raise NotImplementedError
+
+
+# --------------------------------------------------
+# GROQ
+# --------------------------------------------------
+
+class GroqBackend(LLMBackend):
+
+    name = "groq"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        self._client = None
+        self._async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from groq import Groq
+                    # Retries are ours (jittered, deadline-aware), not the SDK's.
+                    self._client = Groq(
+                        api_key=self.api_key,
+                        max_retries=0,
+                        http_client=shared_http_client()
+                    )
+        return self._client
+
+    def _get_async_client(self):
+        loop = asyncio.get_running_loop()
+        async_client = self._async_clients.get(loop)
+        if async_client is None:
+            from groq import AsyncGroq
+            async_client = AsyncGroq(
+                api_key=self.api_key,
+                max_retries=0,
+                http_client=shared_async_http_client()
+            )
+            self._async_clients[loop] = async_client
+        return async_client
+
+    @staticmethod
+    def _translate(error: Exception) -> Exception:
+        import groq
+
+        if isinstance(error, (groq.APITimeoutError, groq.APIConnectionError)):
+            return RetryableLLMError(str(error))
+        if isinstance(error, groq.APIStatusError):
+            if _is_retryable_status(error.status_code):
+                return RetryableLLMError(
+                    str(error), retry_after=_retry_after(error.response.headers)
+                )
+            return LLMError(str(error))
+        return error
+
+    def complete(self, request: Dict[str, object], timeout: float) -> str:
+        import groq
+
+        try:
+            response = self._get_client().chat.completions.create(
+                timeout=timeout, **request
+            )
+        except groq.APIError as e:
+            raise self._translate(e) from e
+        return response.choices[0].message.content
+
+    async def acomplete(self, request: Dict[str, object], timeout: float) -> str:
+        import groq
+
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                timeout=timeout, **request
+            )
+        except groq.APIError as e:
+            raise self._translate(e) from e
+        return response.choices[0].message.content
+
+    def stream(self, request: Dict[str, object], timeout: float) -> Iterator[str]:
+        import groq
+
+        try:
+            chunks = self._get_client().chat.completions.create(
+                stream=True, timeout=timeout, **request
+            )
+            for chunk in chunks:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except groq.APIError as e:
+            raise self._translate(e) from e
+
+
+# --------------------------------------------------
+# OPENAI-COMPATIBLE HTTP ENDPOINT (vLLM, llama.cpp, Ollama, ...)
+# --------------------------------------------------
+
+class OpenAICompatibleBackend(LLMBackend):
+
+    name = "openai"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+    @staticmethod
+    def _check(response) -> None:
+        if response.status_code < 400:
+            return
+        message = f"{response.status_code} from LLM endpoint"
+        if _is_retryable_status(response.status_code):
+            raise RetryableLLMError(message, retry_after=_retry_after(response.headers))
+        raise LLMError(message)
+
+    def complete(self, request: Dict[str, object], timeout: float) -> str:
+        import httpx
+
+        try:
+            response = shared_http_client().post(
+                self.url, json=request, headers=self.headers, timeout=timeout
+            )
+        except httpx.TransportError as e:
+            raise RetryableLLMError(str(e)) from e
+
+        self._check(response)
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def acomplete(self, request: Dict[str, object], timeout: float) -> str:
+        import httpx
+
+        try:
+            response = await shared_async_http_client().post(
+                self.url, json=request, headers=self.headers, timeout=timeout
+            )
+        except httpx.TransportError as e:
+            raise RetryableLLMError(str(e)) from e
+
+        self._check(response)
+        return response.json()["choices"][0]["message"]["content"]
+
+    def stream(self, request: Dict[str, object], timeout: float) -> Iterator[str]:
+        import httpx
+
+        body = dict(request, stream=True)
+        try:
+            with shared_http_client().stream(
+                "POST", self.url, json=body, headers=self.headers, timeout=timeout
+            ) as response:
+                if response.status_code >= 400:
+                    response.read()
+                self._check(response)
+
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        yield delta
+        except httpx.TransportError as e:
+            raise RetryableLLMError(str(e)) from e
+
+
+# --------------------------------------------------
+# IN-PROCESS FAKE (LOAD TESTS / CI, NO NETWORK)
+# --------------------------------------------------
+
+def _fake_response(request: Dict[str, object]) -> str:
+    if request.get("response_format"):
+        return "{}"
+    user_prompt = request["messages"][-1]["content"]
+    return f"[fake completion for {len(user_prompt)} prompt chars]"
+
+
+class FakeBackend(LLMBackend):
+    """
+    Simulates a provider: sleeps `latency` seconds (± jitter) and fails with
+    a retryable 503 at `failure_rate`. `responder` builds the reply text.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        responder: Callable[[Dict[str, object]], str] = _fake_response,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.responder = responder
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _roll(self) -> Tuple[float, bool]:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            failed = self._rng.random() < self.failure_rate
+        return delay, failed
+
+    def complete(self, request: Dict[str, object], timeout: float) -> str:
+        delay, failed = self._roll()
+        time.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise RetryableLLMError("fake backend timed out")
+        if failed:
+            raise RetryableLLMError("503 from fake backend")
+        return self.responder(request)
+
+    async def acomplete(self, request: Dict[str, object], timeout: float) -> str:
+        delay, failed = self._roll()
+        await asyncio.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise RetryableLLMError("fake backend timed out")
+        if failed:
+            raise RetryableLLMError("503 from fake backend")
+        return self.responder(request)
+
+    def stream(self, request: Dict[str, object], timeout: float) -> Iterator[str]:
+        text = self.complete(request, timeout)
+        for i in range(0, len(text), 16):
+            yield text[i:i + 16]
+
+
+# --------------------------------------------------
+# SELECTION
+# --------------------------------------------------
+
+def backend_from_env() -> LLMBackend:
+    """
+    LLM_BACKEND=groq (default) | openai | fake.
+    """
+    kind = os.getenv("LLM_BACKEND", "groq").lower()
+
+    if kind == "groq":
+        return GroqBackend()
+    if kind == "openai":
+        return OpenAICompatibleBackend(
+            base_url=os.getenv("LLM_BASE_URL", "http://localhost:8000/v1"),
+            api_key=os.getenv("LLM_API_KEY")
+        )
+    if kind == "fake":
+        return FakeBackend(
+            latency=float(os.getenv("LLM_FAKE_LATENCY", 0.05)),
+            failure_rate=float(os.getenv("LLM_FAKE_FAILURE_RATE", 0.0))
+        )
+
+    raise ValueError(f"Unknown LLM_BACKEND: {kind!r}")
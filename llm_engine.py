@@ -1,32 +1,278 @@
 # llm_engine.py
 
+import asyncio
+import json
 import os
-from typing import List, Dict
-from groq import Groq
+import threading
+from typing import Awaitable, List, Dict, Iterator, Optional, Tuple
+
+from cache_store import TieredCache, build_cache, make_key
+from explanation_table import lookup_ats, lookup_strengths
+from singleflight import SingleFlight
+from llm_backends import (
+    LLMBackend,
+    backend_from_env,
+    call_with_retries,
+    acall_with_retries,
+    stream_with_retries
+)
 
 # --------------------------------------------------
-# LLM CLIENT (SAFE — NO HARD CODED KEYS)
+# LLM BACKEND (SAFE — NO HARD CODED KEYS)
 # --------------------------------------------------
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# Chosen from LLM_BACKEND (groq | openai | fake) and built on first use:
+# provider SDKs are slow to import and need credentials, and
+# scoring-only callers never touch them.
 
+_backend: Optional[LLMBackend] = None
+_backend_lock = threading.Lock()
 
-MODEL_NAME = "llama-3.1-8b-instant"
+# Per-call deadline covering every retry attempt.
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
 
 
-def call_llm(system_prompt: str, user_prompt: str, temperature: float = 0.2) -> str:
+def get_backend() -> LLMBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_env()
+    return _backend
+
+
+def set_backend(backend: LLMBackend) -> None:
     """
-    Single controlled entry point to the LLM.
+    Swap the provider, e.g. FakeBackend() for load tests and CI.
     """
-    response = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[
+    global _backend
+    _backend = backend
+
+
+MODEL_NAME = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
+
+# Bump whenever a system prompt or prompt template changes so cached
+# responses generated from the old wording are no longer served.
+PROMPT_VERSION = "1"
+
+
+# --------------------------------------------------
+# RESPONSE CACHE
+# --------------------------------------------------
+# Keyed on (prompt version, backend, model, prompts, temperature,
+# max tokens). Set LLM_CACHE_PATH to add a disk tier; responses quote
+# and rewrite resume content, so it is memory-only by default.
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+_UNSET = object()
+_llm_cache = _UNSET
+
+
+def _get_llm_cache() -> Optional[TieredCache]:
+    global _llm_cache
+    if _llm_cache is _UNSET:
+        with _backend_lock:
+            if _llm_cache is _UNSET:
+                _llm_cache = build_cache(
+                    namespace="llm",
+                    path=LLM_CACHE_PATH,
+                    max_entries=2048,
+                    max_bytes=64 * 1024 * 1024,
+                    ttl_seconds=LLM_CACHE_TTL_SECONDS
+                )
+    return _llm_cache
+
+
+def set_llm_cache(cache: Optional[TieredCache]) -> None:
+    """
+    Swap the response cache (any object with get/set, optionally peek),
+    or pass None to disable it.
+    """
+    global _llm_cache
+    _llm_cache = cache
+
+
+def llm_cache_stats() -> Dict[str, int]:
+    cache = _get_llm_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def _cache_key(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool
+) -> str:
+    return make_key(
+        PROMPT_VERSION,
+        get_backend().name,
+        MODEL_NAME,
+        system_prompt.strip(),
+        user_prompt.strip(),
+        temperature,
+        max_tokens,
+        json_mode
+    )
+
+
+def _recheck(cache: Optional[TieredCache], key: str) -> Optional[str]:
+    """
+    Cache lookup for a key whose miss was already counted.
+    """
+    if cache is None:
+        return None
+    peek = getattr(cache, "peek", None)
+    return peek(key) if peek is not None else cache.get(key)
+
+
+# Identical prompts already in flight (another thread, session or
+# coroutine) are awaited, or for streams joined, rather than sent again.
+_flights = SingleFlight()
+
+
+def _build_request(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    json_mode: bool
+) -> Dict[str, object]:
+    request = {
+        "model": MODEL_NAME,
+        "messages": [
             {"role": "system", "content": system_prompt.strip()},
             {"role": "user", "content": user_prompt.strip()}
         ],
-        temperature=temperature,
-        max_tokens=900
-    )
-    return response.choices[0].message.content.strip()
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    if json_mode:
+        request["response_format"] = {"type": "json_object"}
+    return request
+
+
+def call_llm(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.2,
+    max_tokens: int = 900,
+    json_mode: bool = False,
+    timeout: Optional[float] = None
+) -> str:
+    """
+    Single controlled entry point to the LLM.
+    json_mode asks the model for a single JSON object; timeout is the
+    deadline for the whole call including retries.
+    """
+    key = _cache_key(system_prompt, user_prompt, temperature, max_tokens, json_mode)
+    cache = _get_llm_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    def fetch() -> str:
+        # Re-check: a flight for this key may have just landed in the cache.
+        cached = _recheck(cache, key)
+        if cached is not None:
+            return cached
+
+        backend = get_backend()
+        request = _build_request(system_prompt, user_prompt, temperature, max_tokens, json_mode)
+        content = call_with_retries(
+            lambda remaining: backend.complete(request, remaining),
+            timeout or LLM_TIMEOUT_SECONDS
+        ).strip()
+
+        if cache is not None:
+            cache.set(key, content)
+        return content
+
+    return _flights.do(key, fetch)
+
+
+async def acall_llm(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.2,
+    max_tokens: int = 900,
+    json_mode: bool = False,
+    timeout: Optional[float] = None
+) -> str:
+    """
+    Async counterpart of call_llm, safe to run many at once.
+    """
+    key = _cache_key(system_prompt, user_prompt, temperature, max_tokens, json_mode)
+    cache = _get_llm_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def fetch() -> str:
+        cached = _recheck(cache, key)
+        if cached is not None:
+            return cached
+
+        backend = get_backend()
+        request = _build_request(system_prompt, user_prompt, temperature, max_tokens, json_mode)
+        content = (await acall_with_retries(
+            lambda remaining: backend.acomplete(request, remaining),
+            timeout or LLM_TIMEOUT_SECONDS
+        )).strip()
+
+        if cache is not None:
+            cache.set(key, content)
+        return content
+
+    return await _flights.ado(key, fetch)
+
+
+def stream_llm(
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.2,
+    max_tokens: int = 900,
+    timeout: Optional[float] = None
+) -> Iterator[str]:
+    """
+    Streaming variant of call_llm: yields text chunks as they arrive.
+    A cached response is yielded in one piece. Identical streams already
+    in flight are joined: their chunks so far are replayed, then the
+    rest arrive as the leader receives them.
+    """
+    key = _cache_key(system_prompt, user_prompt, temperature, max_tokens, False)
+    cache = _get_llm_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    def produce() -> Iterator[str]:
+        cached = _recheck(cache, key)
+        if cached is not None:
+            yield cached
+            return
+
+        backend = get_backend()
+        request = _build_request(system_prompt, user_prompt, temperature, max_tokens, False)
+
+        parts = []
+        for delta in stream_with_retries(
+            lambda remaining: backend.stream(request, remaining),
+            timeout or LLM_TIMEOUT_SECONDS
+        ):
+            parts.append(delta)
+            yield delta
+
+        # Only a fully consumed stream is cached.
+        if cache is not None:
+            cache.set(key, "".join(parts).strip())
+
+    yield from _flights.stream(key, produce)
 
 
 # --------------------------------------------------
@@ -64,20 +310,20 @@ STRICT RULES:
 # 1️⃣ CROSS-DISCIPLINE REJECTION EXPLANATION
 # --------------------------------------------------
 
-def explain_rejection(
+NO_REJECTION_TEXT = (
+    "This resume was not rejected due to ATS or qualification screening. "
+    "Any hiring decision at this stage would depend on role fit, team needs, "
+    "or competition rather than resume quality."
+)
+
+
+def _rejection_prompt(
     score: int,
     reasons: List[str],
     diagnostics: Dict[str, List[str]],
     target_role: str
 ) -> str:
 
-    if not reasons:
-        return (
-            "This resume was not rejected due to ATS or qualification screening. "
-            "Any hiring decision at this stage would depend on role fit, team needs, "
-            "or competition rather than resume quality."
-        )
-
     reasons_block = "\n".join(f"- {r}" for r in reasons)
 
     missing_block = (
@@ -92,7 +338,7 @@ def explain_rejection(
         else "None"
     )
 
-    prompt = f"""
+    return f"""
 Target Role:
 {target_role}
 
@@ -116,29 +362,65 @@ Do NOT give advice.
 Keep tone professional and direct.
 """
 
+
+def explain_rejection(
+    score: int,
+    reasons: List[str],
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> str:
+
+    if not reasons:
+        return NO_REJECTION_TEXT
+
+    prompt = _rejection_prompt(score, reasons, diagnostics, target_role)
     return call_llm(SYSTEM_RECRUITER, prompt)
 
 
+async def aexplain_rejection(
+    score: int,
+    reasons: List[str],
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> str:
+
+    if not reasons:
+        return NO_REJECTION_TEXT
+
+    prompt = _rejection_prompt(score, reasons, diagnostics, target_role)
+    return await acall_llm(SYSTEM_RECRUITER, prompt)
+
+
+def stream_rejection(
+    score: int,
+    reasons: List[str],
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> Iterator[str]:
+
+    if not reasons:
+        yield NO_REJECTION_TEXT
+        return
+
+    prompt = _rejection_prompt(score, reasons, diagnostics, target_role)
+    yield from stream_llm(SYSTEM_RECRUITER, prompt)
+
+
 # --------------------------------------------------
 # 2️⃣ CROSS-DISCIPLINE STRENGTH SUMMARY
 # --------------------------------------------------
 
-def summarize_strengths(
-    diagnostics: Dict[str, List[str]],
-    target_role: str
-) -> str:
+NO_STRENGTHS_TEXT = (
+    "The resume does not demonstrate strong differentiating signals "
+    "beyond baseline expectations for this role."
+)
 
-    strengths = diagnostics.get("strengths", [])
 
-    if not strengths:
-        return (
-            "The resume does not demonstrate strong differentiating signals "
-            "beyond baseline expectations for this role."
-        )
+def _strengths_prompt(strengths: List[str], target_role: str) -> str:
 
     strength_block = "\n".join(f"- {s}" for s in strengths)
 
-    prompt = f"""
+    return f"""
 Target Role:
 {target_role}
 
@@ -150,22 +432,70 @@ Summarize these strengths in 2–3 professional sentences.
 Do not exaggerate.
 """
 
-    return call_llm(SYSTEM_RECRUITER, prompt)
 
+def summarize_strengths(
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> str:
 
-# --------------------------------------------------
-# 3️⃣ ATS DIAGNOSTIC EXPLANATION
-# --------------------------------------------------
+    strengths = diagnostics.get("strengths", [])
 
-def explain_ats_diagnostics(
+    if not strengths:
+        return NO_STRENGTHS_TEXT
+
+    precomputed = lookup_strengths(diagnostics, target_role)
+    if precomputed is not None:
+        return precomputed
+
+    return call_llm(SYSTEM_RECRUITER, _strengths_prompt(strengths, target_role))
+
+
+async def asummarize_strengths(
     diagnostics: Dict[str, List[str]],
     target_role: str
 ) -> str:
 
+    strengths = diagnostics.get("strengths", [])
+
+    if not strengths:
+        return NO_STRENGTHS_TEXT
+
+    precomputed = lookup_strengths(diagnostics, target_role)
+    if precomputed is not None:
+        return precomputed
+
+    return await acall_llm(SYSTEM_RECRUITER, _strengths_prompt(strengths, target_role))
+
+
+def stream_strengths(
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> Iterator[str]:
+
+    strengths = diagnostics.get("strengths", [])
+
+    if not strengths:
+        yield NO_STRENGTHS_TEXT
+        return
+
+    precomputed = lookup_strengths(diagnostics, target_role)
+    if precomputed is not None:
+        yield precomputed
+        return
+
+    yield from stream_llm(SYSTEM_RECRUITER, _strengths_prompt(strengths, target_role))
+
+
+# --------------------------------------------------
+# 3️⃣ ATS DIAGNOSTIC EXPLANATION
+# --------------------------------------------------
+
+def _ats_prompt(diagnostics: Dict[str, List[str]], target_role: str) -> str:
+
     missing = diagnostics.get("missing_must_have", [])
     weak = diagnostics.get("weak_signals", [])
 
-    prompt = f"""
+    return f"""
 Target Role:
 {target_role}
 
@@ -181,24 +511,53 @@ Do NOT invent missing tools.
 Do NOT provide advice.
 """
 
-    return call_llm(SYSTEM_RECRUITER, prompt)
+
+def explain_ats_diagnostics(
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> str:
+
+    precomputed = lookup_ats(diagnostics, target_role)
+    if precomputed is not None:
+        return precomputed
+
+    return call_llm(SYSTEM_RECRUITER, _ats_prompt(diagnostics, target_role))
+
+
+async def aexplain_ats_diagnostics(
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> str:
+
+    precomputed = lookup_ats(diagnostics, target_role)
+    if precomputed is not None:
+        return precomputed
+
+    return await acall_llm(SYSTEM_RECRUITER, _ats_prompt(diagnostics, target_role))
+
+
+def stream_ats_diagnostics(
+    diagnostics: Dict[str, List[str]],
+    target_role: str
+) -> Iterator[str]:
+
+    precomputed = lookup_ats(diagnostics, target_role)
+    if precomputed is not None:
+        yield precomputed
+        return
+
+    yield from stream_llm(SYSTEM_RECRUITER, _ats_prompt(diagnostics, target_role))
 
 
 # --------------------------------------------------
 # 4️⃣ SAFE BULLET REWRITE
 # --------------------------------------------------
 
-def rewrite_resume_bullets(
-    bullets: List[str],
-    target_role: str
-) -> List[str]:
-
-    if not bullets:
-        return []
+def _rewrite_prompt(bullets: List[str], target_role: str) -> str:
 
     bullet_block = "\n".join(f"- {b}" for b in bullets)
 
-    prompt = f"""
+    return f"""
 Target Role:
 {target_role}
 
@@ -210,10 +569,408 @@ Rewrite each bullet to improve clarity and ATS alignment ONLY.
 Follow all rules strictly.
 """
 
-    output = call_llm(SYSTEM_EDITOR, prompt, temperature=0.25)
 
+def _parse_bullets(output: str) -> List[str]:
     return [
         line.lstrip("- ").strip()
         for line in output.splitlines()
         if line.strip()
     ]
+
+
+def rewrite_resume_bullets(
+    bullets: List[str],
+    target_role: str
+) -> List[str]:
+
+    if not bullets:
+        return []
+
+    output = call_llm(SYSTEM_EDITOR, _rewrite_prompt(bullets, target_role), temperature=0.25)
+
+    return _parse_bullets(output)
+
+
+async def arewrite_resume_bullets(
+    bullets: List[str],
+    target_role: str
+) -> List[str]:
+
+    if not bullets:
+        return []
+
+    output = await acall_llm(
+        SYSTEM_EDITOR, _rewrite_prompt(bullets, target_role), temperature=0.25
+    )
+
+    return _parse_bullets(output)
+
+
+# --------------------------------------------------
+# 5️⃣ COMBINED REPORT (SINGLE STRUCTURED REQUEST)
+# --------------------------------------------------
+
+SYSTEM_COMBINED = """
+You are a senior recruiter and an ATS-focused resume editor.
+
+STRICT RULES:
+- You ONLY explain facts provided by the evaluation system.
+- You NEVER invent missing skills, experience, or gaps.
+- You NEVER give generic advice.
+- You NEVER contradict the score.
+- When rewriting bullets: improve wording only, preserve meaning, scope
+  and seniority, do NOT add tools, metrics, ownership, or deployment,
+  and output exactly one rewritten bullet per input bullet.
+- Respond with a single JSON object and nothing else.
+"""
+
+COMBINED_TASKS = {
+    "rejection_explanation": (
+        "string. Explain clearly why this resume was rejected, using only the "
+        "confirmed reasons. Professional and direct, no advice."
+    ),
+    "strengths_summary": (
+        "string. Summarize the confirmed strengths in 2–3 professional "
+        "sentences. Do not exaggerate."
+    ),
+    "ats_diagnostics": (
+        "string. Explain how the missing expectations and weak signals impact "
+        "ATS and recruiter screening. Do not invent tools, no advice."
+    ),
+    "rewrites": (
+        "array of strings. One rewritten bullet per original bullet, in the "
+        "same order, improving clarity and ATS alignment only."
+    )
+}
+
+
+def _combined_defaults(
+    reasons: List[str],
+    diagnostics: Dict[str, List[str]],
+    project_bullets: List[str],
+    target_role: str
+) -> Dict[str, object]:
+    """
+    Fields answered without the LLM: fixed texts and precomputed table hits.
+    """
+    defaults = {}
+    if not reasons:
+        defaults["rejection_explanation"] = NO_REJECTION_TEXT
+
+    if not diagnostics.get("strengths"):
+        defaults["strengths_summary"] = NO_STRENGTHS_TEXT
+    else:
+        precomputed = lookup_strengths(diagnostics, target_role)
+        if precomputed is not None:
+            defaults["strengths_summary"] = precomputed
+
+    precomputed = lookup_ats(diagnostics, target_role)
+    if precomputed is not None:
+        defaults["ats_diagnostics"] = precomputed
+
+    if not project_bullets:
+        defaults["rewrites"] = []
+    return defaults
+
+
+def _combined_prompt(
+    score: int,
+    reasons: List[str],
+    diagnostics: Dict[str, List[str]],
+    project_bullets: List[str],
+    target_role: str,
+    fields: List[str]
+) -> str:
+
+    def block(items: List[str]) -> str:
+        return "\n".join(f"- {i}" for i in items) if items else "None"
+
+    schema_block = "\n".join(f'- "{f}": {COMBINED_TASKS[f]}' for f in fields)
+
+    return f"""
+Target Role:
+{target_role}
+
+Resume Score:
+{score} / 100
+
+Confirmed Rejection Reasons:
+{block(reasons)}
+
+Missing Core Expectations:
+{block(diagnostics.get("missing_must_have", []))}
+
+Weak or Underrepresented Signals:
+{block(diagnostics.get("weak_signals", []))}
+
+Confirmed Strengths:
+{block(diagnostics.get("strengths", []))}
+
+Original Project Bullets:
+{block(project_bullets)}
+
+Task:
+Return a JSON object with exactly these keys:
+{schema_block}
+"""
+
+
+def _validate_combined(
+    raw: str,
+    fields: List[str],
+    project_bullets: List[str]
+) -> Dict[str, object]:
+    """
+    Returns only the fields that match the schema; anything else is dropped.
+    """
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        return {}
+
+    return _validate_fields(payload, fields, project_bullets)
+
+
+def _validate_fields(
+    payload: object,
+    fields: List[str],
+    project_bullets: List[str]
+) -> Dict[str, object]:
+
+    if not isinstance(payload, dict):
+        return {}
+
+    valid = {}
+    for field in fields:
+        value = payload.get(field)
+
+        if field == "rewrites":
+            if (
+                isinstance(value, list)
+                and len(value) == len(project_bullets)
+                and all(isinstance(v, str) and v.strip() for v in value)
+            ):
+                valid[field] = [v.lstrip("- ").strip() for v in value]
+        elif isinstance(value, str) and value.strip():
+            valid[field] = value.strip()
+
+    return valid
+
+
+def generate_combined_report(
+    score: int,
+    reasons: List[str],
+    diagnostics: Dict[str, List[str]],
+    project_bullets: List[str],
+    target_role: str
+) -> Dict[str, object]:
+    """
+    All four LLM sections from one JSON request. Fields that fail schema
+    validation are regenerated individually via the per-section functions.
+    """
+    result = _combined_defaults(reasons, diagnostics, project_bullets, target_role)
+    fields = [f for f in COMBINED_TASKS if f not in result]
+    if not fields:
+        return result
+
+    prompt = _combined_prompt(
+        score, reasons, diagnostics, project_bullets, target_role, fields
+    )
+
+    raw = call_llm(SYSTEM_COMBINED, prompt, max_tokens=1800, json_mode=True)
+    result.update(_validate_combined(raw, fields, project_bullets))
+
+    retry = {
+        "rejection_explanation": lambda: explain_rejection(
+            score, reasons, diagnostics, target_role
+        ),
+        "strengths_summary": lambda: summarize_strengths(diagnostics, target_role),
+        "ats_diagnostics": lambda: explain_ats_diagnostics(diagnostics, target_role),
+        "rewrites": lambda: rewrite_resume_bullets(project_bullets, target_role)
+    }
+    for field in fields:
+        if field not in result:
+            result[field] = retry[field]()
+
+    return result
+
+
+async def agenerate_combined_report(
+    score: int,
+    reasons: List[str],
+    diagnostics: Dict[str, List[str]],
+    project_bullets: List[str],
+    target_role: str
+) -> Dict[str, object]:
+
+    result = _combined_defaults(reasons, diagnostics, project_bullets, target_role)
+    fields = [f for f in COMBINED_TASKS if f not in result]
+    if not fields:
+        return result
+
+    prompt = _combined_prompt(
+        score, reasons, diagnostics, project_bullets, target_role, fields
+    )
+
+    raw = await acall_llm(SYSTEM_COMBINED, prompt, max_tokens=1800, json_mode=True)
+    result.update(_validate_combined(raw, fields, project_bullets))
+
+    retry = {
+        "rejection_explanation": lambda: aexplain_rejection(
+            score, reasons, diagnostics, target_role
+        ),
+        "strengths_summary": lambda: asummarize_strengths(diagnostics, target_role),
+        "ats_diagnostics": lambda: aexplain_ats_diagnostics(diagnostics, target_role),
+        "rewrites": lambda: arewrite_resume_bullets(project_bullets, target_role)
+    }
+    malformed = [field for field in fields if field not in result]
+    retried = await asyncio.gather(*(retry[field]() for field in malformed))
+    result.update(zip(malformed, retried))
+
+    return result
+
+
+# --------------------------------------------------
+# 6️⃣ MULTI-ROLE REPORT (ROLES BATCHED PER REQUEST)
+# --------------------------------------------------
+# One JSON request answers the combined fields for up to
+# MULTI_ROLE_BATCH_SIZE roles; the shared project bullets are sent once.
+
+MULTI_ROLE_BATCH_SIZE = int(os.getenv("LLM_MULTI_ROLE_BATCH_SIZE", 3))
+MULTI_ROLE_TOKENS_PER_ROLE = 1800
+
+
+def _multi_role_prompt(
+    roles: List[Dict[str, object]],
+    batch: List[Tuple[int, List[str]]],
+    project_bullets: List[str]
+) -> str:
+
+    def block(items: List[str]) -> str:
+        return "\n".join(f"- {i}" for i in items) if items else "None"
+
+    role_blocks = []
+    for n, (i, fields) in enumerate(batch, 1):
+        role = roles[i]
+        diagnostics = role["diagnostics"]
+        schema_block = "\n".join(f'- "{f}": {COMBINED_TASKS[f]}' for f in fields)
+        role_blocks.append(f"""
+=== "role_{n}" ===
+
+Target Role:
+{role["target_role"]}
+
+Resume Score:
+{role["score"]} / 100
+
+Confirmed Rejection Reasons:
+{block(role["reasons"])}
+
+Missing Core Expectations:
+{block(diagnostics.get("missing_must_have", []))}
+
+Weak or Underrepresented Signals:
+{block(diagnostics.get("weak_signals", []))}
+
+Confirmed Strengths:
+{block(diagnostics.get("strengths", []))}
+
+Keys for "role_{n}":
+{schema_block}
+""")
+
+    keys = ", ".join(f'"role_{n}"' for n in range(1, len(batch) + 1))
+
+    return f"""
+Original Project Bullets (same resume for every role):
+{block(project_bullets)}
+{"".join(role_blocks)}
+Task:
+Return a JSON object with exactly the keys {keys}. Each maps to an
+object with exactly the keys listed for that role, written for that
+role's target only.
+"""
+
+
+def _asection(
+    field: str,
+    role: Dict[str, object],
+    project_bullets: List[str]
+) -> Awaitable[object]:
+    """
+    Per-section request for one combined field (the retry path).
+    """
+    target_role = role["target_role"]
+    diagnostics = role["diagnostics"]
+
+    if field == "rejection_explanation":
+        return aexplain_rejection(role["score"], role["reasons"], diagnostics, target_role)
+    if field == "strengths_summary":
+        return asummarize_strengths(diagnostics, target_role)
+    if field == "ats_diagnostics":
+        return aexplain_ats_diagnostics(diagnostics, target_role)
+    return arewrite_resume_bullets(project_bullets, target_role)
+
+
+async def agenerate_multi_role_combined(
+    roles: List[Dict[str, object]],
+    project_bullets: List[str]
+) -> List[Dict[str, object]]:
+    """
+    Combined-report fields for several target roles of one resume, in
+    order. Each role dict carries target_role, score, reasons and
+    diagnostics. Roles fully answered by defaults cost no request; the
+    rest share ceil(n / MULTI_ROLE_BATCH_SIZE) requests, and fields that
+    fail validation are regenerated individually.
+    """
+    results = [
+        _combined_defaults(
+            role["reasons"], role["diagnostics"], project_bullets, role["target_role"]
+        )
+        for role in roles
+    ]
+    pending = [
+        (i, [f for f in COMBINED_TASKS if f not in result])
+        for i, result in enumerate(results)
+    ]
+    pending = [(i, fields) for i, fields in pending if fields]
+
+    size = max(1, MULTI_ROLE_BATCH_SIZE)
+    batches = [pending[j:j + size] for j in range(0, len(pending), size)]
+
+    raws = await asyncio.gather(*(
+        acall_llm(
+            SYSTEM_COMBINED,
+            _multi_role_prompt(roles, batch, project_bullets),
+            max_tokens=MULTI_ROLE_TOKENS_PER_ROLE * len(batch),
+            json_mode=True
+        )
+        for batch in batches
+    ))
+
+    for batch, raw in zip(batches, raws):
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            payload = {}
+        if not isinstance(payload, dict):
+            payload = {}
+
+        for n, (i, fields) in enumerate(batch, 1):
+            results[i].update(
+                _validate_fields(payload.get(f"role_{n}"), fields, project_bullets)
+            )
+
+    malformed = [
+        (i, field)
+        for i, fields in pending
+        for field in fields
+        if field not in results[i]
+    ]
+    retried = await asyncio.gather(*(
+        _asection(field, roles[i], project_bullets) for i, field in malformed
+    ))
+    for (i, field), value in zip(malformed, retried):
+        results[i][field] = value
+
+    return results
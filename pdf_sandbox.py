@@ -0,0 +1,162 @@
+# pdf_sandbox.py
+#
+# Runs pypdf in a separate, resource-limited process so a pathological
+# PDF (huge content streams, deeply nested objects) cannot pin a core or
+# inflate the RSS of the server that handles every other session.
+
+import multiprocessing
+import os
+import threading
+from io import BytesIO
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from pypdf import PdfReader
+
+from resume_parser import PdfSource, _normalize_lines, _page_layout, read_pdf_bytes
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, time/page/char budgets still apply
+    resource = None
+
+
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PDF_PARSE_TIMEOUT_SECONDS", 20))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PDF_PARSE_MEMORY_LIMIT_MB", 1024))
+PARSE_MAX_PAGES = int(os.getenv("PDF_PARSE_MAX_PAGES", 50))
+PARSE_MAX_CHARS = int(os.getenv("PDF_PARSE_MAX_CHARS", 200_000))
+PARSE_MAX_WORKERS = int(os.getenv("PDF_PARSE_MAX_WORKERS", 2))
+
+# Bounds how many sandboxed parses run at once; extra requests queue here.
+_slots = threading.BoundedSemaphore(PARSE_MAX_WORKERS)
+
+
+class PdfParseError(Exception):
+    """
+    Structured parse failure. code is one of: timeout, memory,
+    too_many_pages, too_much_text, invalid_pdf, crashed.
+    """
+
+    def __init__(self, code: str, detail: str):
+        super().__init__(f"{code}: {detail}")
+        self.code = code
+        self.detail = detail
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"error": "pdf_parse_error", "code": self.code, "detail": self.detail}
+
+
+def _context():
+    # forkserver avoids forking a multi-threaded server process
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _worker(conn, data: bytes, memory_limit_mb: int, max_pages: int, max_chars: int) -> None:
+    """
+    Child process: apply the address-space limit, then extract.
+    Sends ("ok", text, emphasized) or ("error", code, detail).
+    """
+    try:
+        if resource is not None and memory_limit_mb > 0:
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        try:
+            reader = PdfReader(BytesIO(data))
+            page_count = len(reader.pages)
+        except MemoryError:
+            raise
+        except Exception as e:
+            conn.send(("error", "invalid_pdf", str(e)))
+            return
+
+        if page_count > max_pages:
+            conn.send(("error", "too_many_pages", f"{page_count} pages (limit {max_pages})"))
+            return
+
+        text_chunks = []
+        emphasized = set()
+        total_chars = 0
+        for idx, page in enumerate(reader.pages):
+            try:
+                text, page_emphasized = _page_layout(page)
+            except MemoryError:
+                raise
+            except Exception as e:
+                print(f"[WARN] Failed to read page {idx}: {e}")
+                continue
+
+            chunk = _normalize_lines(text or "")
+            if chunk:
+                text_chunks.append(chunk)
+                emphasized.update(page_emphasized)
+                total_chars += len(chunk)
+                if total_chars > max_chars:
+                    conn.send(("error", "too_much_text", f"over {max_chars} characters"))
+                    return
+
+        conn.send(("ok", "\n".join(text_chunks), frozenset(emphasized)))
+
+    except MemoryError:
+        conn.send(("error", "memory", f"exceeded {memory_limit_mb} MB"))
+    finally:
+        conn.close()
+
+
+def extract_layout_sandboxed(
+    pdf_path: PdfSource,
+    timeout: Optional[float] = None,
+    memory_limit_mb: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> Tuple[str, FrozenSet[str]]:
+    """
+    Same output as extract_text_from_pdf(preserve_lines=True) plus the
+    emphasized (bold / large) lines, computed in a killable child
+    process under time, memory, page and character budgets.
+    Raises PdfParseError when any budget is exceeded.
+    """
+    timeout = PARSE_TIMEOUT_SECONDS if timeout is None else timeout
+    memory_limit_mb = PARSE_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+    max_pages = PARSE_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PARSE_MAX_CHARS if max_chars is None else max_chars
+
+    data = bytes(read_pdf_bytes(pdf_path))
+
+    with _slots:
+        ctx = _context()
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=_worker,
+            args=(child_conn, data, memory_limit_mb, max_pages, max_chars),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        try:
+            if not parent_conn.poll(timeout):
+                raise PdfParseError("timeout", f"parsing took longer than {timeout:g}s")
+            message = parent_conn.recv()
+        except EOFError:
+            process.join(1)
+            raise PdfParseError("crashed", f"parser exited with code {process.exitcode}")
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+            parent_conn.close()
+
+    if message[0] == "ok":
+        return message[1], message[2]
+
+    _, code, detail = message
+    raise PdfParseError(code, detail)
+
+
+def extract_text_sandboxed(pdf_path: PdfSource, **limits) -> str:
+    """
+    Sandboxed equivalent of extract_text_from_pdf (single-line text).
+    """
+    text, _ = extract_layout_sandboxed(pdf_path, **limits)
+    return text.replace("\n", " ")
@@ -1,78 +1,181 @@
 # report_generator.py
 
-from typing import Dict
-from resume_parser import extract_text_from_pdf
-from analyzer import split_into_sections, score_resume
+import asyncio
+import copy
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+from cache_store import TieredCache, build_cache, make_key
+from resume_parser import PARSER_VERSION, PdfSource, parse_resume, pdf_sha256, read_pdf_bytes
+from analyzer import IMPLICIT_SIGNAL_MAP, score_resume
+from features import extract_features
 from llm_engine import (
-    explain_rejection,
-    summarize_strengths,
-    explain_ats_diagnostics,
-    rewrite_resume_bullets
+    MODEL_NAME,
+    PROMPT_VERSION,
+    get_backend,
+    aexplain_rejection,
+    asummarize_strengths,
+    aexplain_ats_diagnostics,
+    arewrite_resume_bullets,
+    agenerate_combined_report,
+    agenerate_multi_role_combined
 )
+from llm_backends import run_sync
 from improvement_engine import generate_improvements
 from evaluation_engine import evaluate_resume
+from explanation_table import table_version
+from role_profiles import COMPILED_PROFILES, profile_fingerprint, resolve_role
 
 
-def generate_final_report(
-    pdf_path: str,
-    target_role: str
-) -> Dict[str, object]:
+# "sections": one LLM request per report section, sent concurrently.
+# "combined": a single structured request covering every section.
+# "deterministic": scores, gaps and improvements only — no LLM calls,
+#                  no API key required; LLM fields are returned as None.
+REPORT_MODES = ("sections", "combined", "deterministic")
 
-    # ---------------------------------
-    # 1️⃣ Parse resume
-    # ---------------------------------
-    resume_text = extract_text_from_pdf(pdf_path)
-    sections = split_into_sections(resume_text)
 
-    # ---------------------------------
-    # 2️⃣ Deterministic analysis
-    # ---------------------------------
-    score, reasons, diagnostics = score_resume(
-        resume_text=resume_text,
-        sections=sections,
-        target_role=target_role
-    )
+NO_REWRITE_TEXT = "No bullet rewrite required — project bullets are already ATS-aligned."
 
-    # ---------------------------------
-    # 3️⃣ Dual scoring + role fit
-    # ---------------------------------
-    evaluation = evaluate_resume(
-        resume_text=resume_text,
-        sections=sections,
-        diagnostics=diagnostics,
-        target_role=target_role
-    )
 
-    # ---------------------------------
-    # 4️⃣ LLM explanations (constrained)
-    # ---------------------------------
-    rejection_explanation = explain_rejection(
-        score=score,
-        reasons=reasons,
-        diagnostics=diagnostics,
-        target_role=target_role
-    )
+# ---------------------------------
+# REPORT CACHE
+# ---------------------------------
+# Whole reports keyed on (PDF SHA-256, resolved profile, scoring
+# fingerprint, prompt/parser/report versions, explanation table version,
+# backend, model, mode), so an edited profile, keyword map or prompt
+# misses on its own. Reports describe a person, so the cache is
+# memory-only unless REPORT_CACHE_PATH is set.
 
-    strengths_summary = summarize_strengths(
-        diagnostics=diagnostics,
-        target_role=target_role
-    )
+# Bump whenever scoring rules or the report layout change.
+REPORT_VERSION = "1"
+
+# Every profile feeds recommended_roles and the implicit keywords feed
+# every score, so any edit to either changes every report.
+SCORING_FINGERPRINT = make_key(
+    [profile_fingerprint(profile) for profile in COMPILED_PROFILES.values()],
+    IMPLICIT_SIGNAL_MAP
+)
+
+REPORT_CACHE_PATH = os.getenv("REPORT_CACHE_PATH", "")
+REPORT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_CACHE_TTL_SECONDS", 24 * 3600))
+
+_UNSET = object()
+_report_cache = _UNSET
+
+
+def _get_report_cache() -> Optional[TieredCache]:
+    global _report_cache
+    if _report_cache is _UNSET:
+        _report_cache = build_cache(
+            namespace="report",
+            path=REPORT_CACHE_PATH,
+            max_entries=256,
+            max_bytes=32 * 1024 * 1024,
+            ttl_seconds=REPORT_CACHE_TTL_SECONDS
+        )
+    return _report_cache
+
+
+def set_report_cache(cache: Optional[TieredCache]) -> None:
+    """
+    Swap the report cache (any object with get/set), or pass None to disable it.
+    """
+    global _report_cache
+    _report_cache = cache
+
+
+def report_cache_stats() -> Dict[str, int]:
+    cache = _get_report_cache()
+    return cache.stats() if cache is not None else {}
 
-    ats_diagnostics = explain_ats_diagnostics(
-        diagnostics=diagnostics,
-        target_role=target_role
+
+def report_cache_key(pdf_sha: str, profile_key: str, mode: str) -> str:
+    # deterministic reports make no LLM calls, so no backend is built
+    llm = (
+        ("", "", "")
+        if mode == "deterministic"
+        else (get_backend().name, MODEL_NAME, table_version())
+    )
+    return make_key(
+        REPORT_VERSION,
+        PARSER_VERSION,
+        PROMPT_VERSION,
+        SCORING_FINGERPRINT,
+        pdf_sha,
+        profile_key,
+        *llm,
+        mode
     )
 
+
+def cached_report(
+    pdf_sha: str,
+    target_role: str,
+    mode: str
+) -> Optional[Dict[str, object]]:
+    """
+    The cached report for this PDF and role, or None on a miss.
+    """
+    cache = _get_report_cache()
+    if cache is None:
+        return None
+
+    # titles resolving to the same profile share an entry
+    role_match = resolve_role(target_role)
+    cached = cache.get(report_cache_key(pdf_sha, role_match.key, mode))
+    if cached is None:
+        return None
+
+    # the memory tier holds the stored object itself: hand out a copy
+    report = copy.deepcopy(cached)
+    report["target_role"] = target_role
+    report["matched_role_alias"] = role_match.alias
+    return report
+
+
+def cache_report(pdf_sha: str, report: Dict[str, object], mode: str) -> None:
+    cache = _get_report_cache()
+    if cache is not None:
+        cache.set(
+            report_cache_key(pdf_sha, report["resolved_profile"], mode),
+            copy.deepcopy(report)
+        )
+
+
+def analyze_resume(
+    pdf_path: PdfSource,
+    target_role: str,
+    sandbox: Optional[bool] = None
+) -> Dict[str, object]:
+    """
+    Deterministic stages only (parse, score, evaluate, improve).
+    pdf_path may be a path, PDF bytes or a binary file object;
+    sandbox=True parses under resource limits (raises PdfParseError).
+    Returns everything the report and the LLM stages need.
+    """
+    return analyze_roles(pdf_path, [target_role], sandbox=sandbox)[0]
+
+
+def analyze_roles(
+    pdf_path: PdfSource,
+    target_roles: List[str],
+    sandbox: Optional[bool] = None
+) -> List[Dict[str, object]]:
+    """
+    analyze_resume for several target roles: the PDF is parsed and its
+    features extracted once, then every role is scored from them.
+    """
+
     # ---------------------------------
-    # 5️⃣ Improvement suggestions
+    # 1️⃣ Parse resume
     # ---------------------------------
-    improvements = generate_improvements(
-        diagnostics=diagnostics,
-        target_role=target_role
-    )
+    resume_text, sections = parse_resume(pdf_path, sandbox=sandbox)
+
+    # one pass over the text, shared by every engine and role below
+    features = extract_features(resume_text, sections)
 
     # ---------------------------------
-    # 6️⃣ Bullet rewrite (safe)
+    # 5️⃣ Bullet candidates (role-independent)
     # ---------------------------------
     raw_projects = sections.get("projects", "")
     project_bullets = [
@@ -81,23 +184,78 @@ def generate_final_report(
         if len(b.strip()) > 40
     ][:4]
 
-    rewritten_bullets = (
-        rewrite_resume_bullets(project_bullets, target_role)
-        if project_bullets
-        else ["No bullet rewrite required — project bullets are already ATS-aligned."]
-    )
+    analyses = []
+    for target_role in target_roles:
+
+        # ---------------------------------
+        # 2️⃣ Deterministic analysis
+        # ---------------------------------
+        score, reasons, diagnostics = score_resume(
+            resume_text=resume_text,
+            sections=sections,
+            target_role=target_role,
+            features=features
+        )
+
+        # ---------------------------------
+        # 3️⃣ Dual scoring + role fit
+        # ---------------------------------
+        evaluation = evaluate_resume(
+            resume_text=resume_text,
+            sections=sections,
+            diagnostics=diagnostics,
+            target_role=target_role,
+            features=features
+        )
+
+        # ---------------------------------
+        # 4️⃣ Improvement suggestions
+        # ---------------------------------
+        improvements = generate_improvements(
+            diagnostics=diagnostics,
+            target_role=target_role
+        )
+
+        analyses.append({
+            "target_role": target_role,
+            "role_match": resolve_role(target_role)._asdict(),
+            "score": score,
+            "reasons": reasons,
+            "diagnostics": diagnostics,
+            "evaluation": evaluation,
+            "improvements": improvements,
+            "project_bullets": list(project_bullets)
+        })
+
+    return analyses
+
+
+def build_report(
+    analysis: Dict[str, object],
+    rejection_explanation: Optional[str],
+    strengths_summary: Optional[str],
+    ats_diagnostics: Optional[str],
+    rewritten_bullets: Optional[List[str]]
+) -> Dict[str, object]:
+    """
+    Assembles the final report dict from the analysis and LLM outputs.
+    """
+    evaluation = analysis["evaluation"]
+    diagnostics = analysis["diagnostics"]
+
+    if rewritten_bullets is not None and not analysis["project_bullets"]:
+        rewritten_bullets = [NO_REWRITE_TEXT]
 
-    # ---------------------------------
-    # 7️⃣ Final report
-    # ---------------------------------
     return {
-        "target_role": target_role,
+        "target_role": analysis["target_role"],
 
         # Scores
         "ats_score": evaluation["ats_score"],
         "role_readiness_score": evaluation["role_readiness_score"],
 
         # Fit
+        "resolved_profile": analysis["role_match"]["key"],
+        "matched_role_alias": analysis["role_match"]["alias"],
         "recommended_roles": evaluation["recommended_roles"],
 
         # Explanations
@@ -110,18 +268,228 @@ def generate_final_report(
         "weak_signals": diagnostics["weak_signals"],
 
         # Improvements
-        "how_to_improve": improvements,
+        "how_to_improve": analysis["improvements"],
 
         # Rewrites
         "sample_bullet_rewrites": rewritten_bullets
     }
 
 
+async def agenerate_explanations(
+    analysis: Dict[str, object],
+    mode: str = "sections"
+) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[List[str]]]:
+    """
+    LLM stages for an analysis: (rejection_explanation, strengths_summary,
+    ats_diagnostics, rewritten_bullets). All None in deterministic mode.
+    """
+    if mode not in REPORT_MODES:
+        raise ValueError(f"Unknown report mode: {mode!r}")
+
+    target_role = analysis["target_role"]
+    score = analysis["score"]
+    reasons = analysis["reasons"]
+    diagnostics = analysis["diagnostics"]
+    project_bullets = analysis["project_bullets"]
+
+    if mode == "deterministic":
+        return None, None, None, None
+
+    if mode == "combined":
+        combined = await agenerate_combined_report(
+            score=score,
+            reasons=reasons,
+            diagnostics=diagnostics,
+            project_bullets=project_bullets,
+            target_role=target_role
+        )
+        return (
+            combined["rejection_explanation"],
+            combined["strengths_summary"],
+            combined["ats_diagnostics"],
+            combined["rewrites"]
+        )
+
+    return tuple(await asyncio.gather(
+        aexplain_rejection(
+            score=score,
+            reasons=reasons,
+            diagnostics=diagnostics,
+            target_role=target_role
+        ),
+        asummarize_strengths(
+            diagnostics=diagnostics,
+            target_role=target_role
+        ),
+        aexplain_ats_diagnostics(
+            diagnostics=diagnostics,
+            target_role=target_role
+        ),
+        arewrite_resume_bullets(project_bullets, target_role)
+    ))
+
+
+async def agenerate_final_report(
+    pdf_path: PdfSource,
+    target_role: str,
+    mode: str = "sections"
+) -> Dict[str, object]:
+    """
+    Builds the full report; the four LLM stages run concurrently,
+    or as one structured request when mode="combined". Repeat requests
+    are served from the report cache.
+    """
+    if mode not in REPORT_MODES:
+        raise ValueError(f"Unknown report mode: {mode!r}")
+
+    data = await asyncio.to_thread(read_pdf_bytes, pdf_path)
+    pdf_sha = pdf_sha256(data)
+
+    cached = cached_report(pdf_sha, target_role, mode)
+    if cached is not None:
+        return cached
+
+    # parsing (possibly a sandbox wait) and scoring are blocking work;
+    # keep them off the event loop
+    analysis = await asyncio.to_thread(analyze_resume, data, target_role)
+
+    # ---------------------------------
+    # 6️⃣ LLM explanations + bullet rewrite
+    # ---------------------------------
+    (
+        rejection_explanation,
+        strengths_summary,
+        ats_diagnostics,
+        rewritten_bullets
+    ) = await agenerate_explanations(analysis, mode)
+
+    # ---------------------------------
+    # 7️⃣ Final report
+    # ---------------------------------
+    report = build_report(
+        analysis,
+        rejection_explanation=rejection_explanation,
+        strengths_summary=strengths_summary,
+        ats_diagnostics=ats_diagnostics,
+        rewritten_bullets=rewritten_bullets
+    )
+
+    cache_report(pdf_sha, report, mode)
+    return report
+
+
+def generate_final_report(
+    pdf_path: PdfSource,
+    target_role: str,
+    mode: str = "sections"
+) -> Dict[str, object]:
+    """
+    Blocking wrapper around agenerate_final_report.
+    """
+    coro = agenerate_final_report(
+        pdf_path=pdf_path,
+        target_role=target_role,
+        mode=mode
+    )
+
+    # one long-lived loop for every blocking call, so the pooled HTTP
+    # clients are reused; also works from inside a running loop
+    return run_sync(coro)
+
+
+# ---------------------------------
+# MULTI-ROLE REPORT
+# ---------------------------------
+
+async def agenerate_multi_role_report(
+    pdf_path: PdfSource,
+    target_roles: List[str],
+    mode: str = "combined",
+    sandbox: Optional[bool] = None
+) -> Dict[str, object]:
+    """
+    Reports for several target roles of one resume. Parsing and feature
+    extraction run once; in "combined" mode the LLM fields of all roles
+    are batched into as few requests as possible (see
+    llm_engine.agenerate_multi_role_combined).
+    Returns {"target_roles", "reports": {role: report}, "ranking"}, with
+    ranking ordered by role readiness.
+    """
+    if mode not in REPORT_MODES:
+        raise ValueError(f"Unknown report mode: {mode!r}")
+
+    target_roles = list(dict.fromkeys(r.strip() for r in target_roles if r.strip()))
+    if not target_roles:
+        raise ValueError("At least one target role is required")
+
+    analyses = await asyncio.to_thread(analyze_roles, pdf_path, target_roles, sandbox)
+
+    if mode == "combined":
+        combined = await agenerate_multi_role_combined(
+            roles=analyses,
+            project_bullets=analyses[0]["project_bullets"]
+        )
+        explanations = [
+            (
+                c["rejection_explanation"],
+                c["strengths_summary"],
+                c["ats_diagnostics"],
+                c["rewrites"]
+            )
+            for c in combined
+        ]
+    else:
+        explanations = await asyncio.gather(*(
+            agenerate_explanations(analysis, mode) for analysis in analyses
+        ))
+
+    reports = {
+        analysis["target_role"]: build_report(analysis, *explained)
+        for analysis, explained in zip(analyses, explanations)
+    }
+
+    ranking = sorted(
+        target_roles,
+        key=lambda role: reports[role]["role_readiness_score"],
+        reverse=True
+    )
+
+    return {
+        "target_roles": target_roles,
+        "reports": reports,
+        "ranking": ranking
+    }
+
+
+def generate_multi_role_report(
+    pdf_path: PdfSource,
+    target_roles: List[str],
+    mode: str = "combined",
+    sandbox: Optional[bool] = None
+) -> Dict[str, object]:
+    """
+    Blocking wrapper around agenerate_multi_role_report.
+    """
+    coro = agenerate_multi_role_report(
+        pdf_path=pdf_path,
+        target_roles=target_roles,
+        mode=mode,
+        sandbox=sandbox
+    )
+
+    return run_sync(coro)
+
+
 # ---------------------------------
-# 🧪 LOCAL TEST
+# 🧪 LOCAL TEST / BATCH CLI
 # ---------------------------------
 if __name__ == "__main__":
 
+    if sys.argv[1:2] == ["batch"]:
+        # python -m report_generator batch <pdfs...> --role ... (see batch_runner)
+        from batch_runner import main
+        sys.exit(main(sys.argv[2:]))
+
     report = generate_final_report(
         pdf_path="sample_resume.pdf",
         target_role="Machine Learning Engineer"
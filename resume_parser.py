@@ -1,30 +1,485 @@
+import atexit
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import BinaryIO, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple, Union
+
 from pypdf import PdfReader
 
+from analyzer import SectionSplitter, split_into_sections
+from cache_store import TieredCache, build_cache
+
+
+# Bump whenever extraction, normalization or section splitting changes
+# output, so cached parses of the same bytes are not reused.
+PARSER_VERSION = "3"
+
+
+# A path, raw PDF bytes (bytes / bytearray / memoryview) or a seekable
+# binary file object such as a Streamlit UploadedFile.
+PdfSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+# Documents shorter than this stay on the serial path: starting workers
+# and re-opening the file costs more than extracting a short resume.
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 8))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+
+def _in_child_process() -> bool:
     """
-    Extract raw text from a PDF resume in an ATS-like manner.
+    True inside a pool worker or sandbox child. Those never start a page
+    pool of their own: their parent already spreads work across cores,
+    and multiprocessing joins a child's children before it can exit.
+    """
+    return multiprocessing.parent_process() is not None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # forkserver, as in pdf_sandbox: the Streamlit server is
+                # multi-threaded and must not be forked
+                methods = multiprocessing.get_all_start_methods()
+                _pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context(
+                        "forkserver" if "forkserver" in methods else "spawn"
+                    )
+                )
+                atexit.register(shutdown_pool)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """
+    Stop the page pool's workers; the next parallel extraction starts a new pool.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    Read-only, seekable file view over a buffer — no up-front copy.
+    """
+
+    def __init__(self, buffer: Union[bytearray, memoryview]):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        # release the view so the underlying buffer (e.g. a shared-memory
+        # block) can be closed
+        self._view.release()
+        super().close()
+
+
+def _open_source(source: PdfSource):
+    """
+    Something PdfReader accepts, without copying in-memory input.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    if isinstance(source, bytes):
+        # BytesIO shares an immutable bytes buffer until it is written to.
+        return io.BytesIO(source)
+    if isinstance(source, (bytearray, memoryview)):
+        return _BufferReader(source)
+    if source.seekable():
+        return source
+    return io.BytesIO(source.read())
+
+
+class _SharedPdf(NamedTuple):
+    """
+    In-memory PDF handed to pool workers through a shared-memory block
+    instead of being pickled into every shard.
     """
+    name: str
+    size: int
+
+
+def _share_source(
+    source: PdfSource
+) -> Tuple[Optional[SharedMemory], Union[str, os.PathLike, _SharedPdf]]:
+    """
+    (block, worker source): in-memory input is copied into a new
+    shared-memory block, which the caller unlinks. Paths are passed
+    through with no block; workers open them themselves.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return None, source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = memoryview(source).cast("B")
+    else:
+        source.seek(0)
+        data = memoryview(source.read())
+
+    block = SharedMemory(create=True, size=max(1, len(data)))
+    block.buf[:len(data)] = data
+    return block, _SharedPdf(block.name, len(data))
+
+
+# (raw page text, emphasized lines): the second item holds lowercased,
+# normalized lines set in bold or a larger font, and is only filled in
+# layout mode.
+PageText = Tuple[str, FrozenSet[str]]
+
+# A fragment at least this much larger than the page's body text counts
+# as emphasized (section headers are typically set larger).
+EMPHASIS_SIZE_RATIO = 1.15
+_BOLD_MARKERS = ("bold", "black", "heavy", "semibold")
+
+
+def _normalize_chunk(text: str) -> str:
+    """
+    ATS normalization in one pass: str.split() already treats tabs and
+    non-breaking spaces as whitespace, so every run collapses to " ".
+    """
+    return " ".join(text.split())
+
+
+def _normalize_lines(text: str) -> str:
+    """
+    Same normalization per line, keeping line breaks and dropping blank lines.
+    """
+    return "\n".join(filter(None, (_normalize_chunk(line) for line in text.splitlines())))
+
+
+def _page_layout(page) -> PageText:
+    """
+    Page text plus the lines pypdf's visitor saw in bold or large type.
+    """
+    fragments = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if not text.strip():
+            return
+        scale = abs(tm[3] * cm[3]) if tm and cm else 1.0
+        font_name = str(font_dict.get("/BaseFont", "")).lower() if font_dict else ""
+        bold = any(marker in font_name for marker in _BOLD_MARKERS)
+        fragments.append((text, (font_size or 0) * scale, bold))
+
+    text = page.extract_text(visitor_text=visitor)
+    if not fragments:
+        return text, frozenset()
+
+    # body size = size carrying the most characters
+    weight: Dict[float, int] = {}
+    for fragment, size, _ in fragments:
+        weight[size] = weight.get(size, 0) + len(fragment)
+    body_size = max(weight, key=weight.get)
 
-    reader = PdfReader(pdf_path)
-    text_chunks = []
+    emphasized = frozenset(
+        _normalize_chunk(fragment).lower()
+        for fragment, size, bold in fragments
+        if bold or size >= body_size * EMPHASIS_SIZE_RATIO
+    )
+    return text, emphasized
 
-    for idx, page in enumerate(reader.pages):
+
+def _iter_pages(
+    reader: PdfReader,
+    start: int,
+    stop: int,
+    layout: bool = False
+) -> Iterator[PageText]:
+    """
+    Raw text of pages [start, stop), one page in memory at a time.
+    """
+    for idx in range(start, stop):
         try:
-            text = page.extract_text()
+            if layout:
+                text, emphasized = _page_layout(reader.pages[idx])
+            else:
+                text, emphasized = reader.pages[idx].extract_text(), frozenset()
             if text:
-                text_chunks.append(text)
+                yield text, emphasized
         except Exception as e:
             print(f"[WARN] Failed to read page {idx}: {e}")
 
-    full_text = "\n".join(text_chunks)
 
-    # ATS normalization
-    full_text = full_text.replace("\t", " ")
-    full_text = full_text.replace("\xa0", " ")
-    full_text = " ".join(full_text.split())
+def _extract_page_range(
+    source: Union[str, os.PathLike, _SharedPdf],
+    start: int,
+    stop: int,
+    layout: bool
+) -> List[PageText]:
+    """
+    Worker entry point: opens the document independently and extracts [start, stop).
+    Shared-memory input is read in place and detached once the shard is
+    done, so workers keep no copy of the document between shards.
+    """
+    if not isinstance(source, _SharedPdf):
+        return list(_iter_pages(PdfReader(_open_source(source)), start, stop, layout))
+
+    block = SharedMemory(name=source.name)
+    try:
+        with _BufferReader(block.buf[:source.size]) as stream:
+            return list(_iter_pages(PdfReader(stream), start, stop, layout))
+    finally:
+        block.close()
+
+
+def _iter_parallel(
+    source: PdfSource,
+    page_count: int,
+    workers: int,
+    layout: bool
+) -> Iterator[PageText]:
+    # A few shards per worker keeps the pool busy when pages vary in cost.
+    shard_size = max(1, -(-page_count // (workers * 2)))
+    starts = range(0, page_count, shard_size)
+    stops = [min(start + shard_size, page_count) for start in starts]
+    n = len(stops)
+
+    # Paths are opened by each worker; in-memory input is placed in shared
+    # memory once rather than pickled into every shard.
+    block, worker_source = _share_source(source)
+
+    try:
+        # pool.map yields shards in page order as they complete
+        pool = _get_pool()
+        for shard in pool.map(_extract_page_range, [worker_source] * n, starts, stops, [layout] * n):
+            yield from shard
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
+
+
+def iter_page_chunks(
+    pdf_path: PdfSource,
+    char_budget: Optional[int] = None,
+    parallel: Optional[bool] = None,
+    preserve_lines: bool = False
+) -> Iterator[PageText]:
+    """
+    Normalized, non-empty page texts in page order with their emphasized
+    lines. preserve_lines keeps one line per text line and collects font
+    hints; otherwise each page is collapsed to a single line. Stops after
+    the page that reaches char_budget, so a budget always yields whole pages.
+    """
+    reader = PdfReader(_open_source(pdf_path))
+    page_count = len(reader.pages)
+
+    if parallel is None:
+        parallel = (
+            char_budget is None
+            and page_count >= PARALLEL_MIN_PAGES
+            and PDF_WORKERS > 1
+        )
+    if parallel and _in_child_process():
+        # same output, extracted serially (see _in_child_process)
+        parallel = False
+
+    pages = (
+        _iter_parallel(pdf_path, page_count, PDF_WORKERS, preserve_lines)
+        if parallel
+        else _iter_pages(reader, 0, page_count, preserve_lines)
+    )
+    normalize = _normalize_lines if preserve_lines else _normalize_chunk
+
+    emitted = 0
+    for text, emphasized in pages:
+        chunk = normalize(text)
+        if not chunk:
+            continue
+
+        yield chunk, emphasized
+
+        emitted += len(chunk) + 1
+        if char_budget is not None and emitted >= char_budget:
+            return
+
+
+def iter_text_chunks(
+    pdf_path: PdfSource,
+    char_budget: Optional[int] = None,
+    parallel: Optional[bool] = None
+) -> Iterator[str]:
+    """
+    Normalized single-line page texts; joined with " " they equal
+    extract_text_from_pdf.
+    """
+    for chunk, _ in iter_page_chunks(pdf_path, char_budget, parallel):
+        yield chunk
+
+
+def extract_text_from_pdf(
+    pdf_path: PdfSource,
+    parallel: Optional[bool] = None,
+    preserve_lines: bool = False
+) -> str:
+    """
+    Extract raw text from a PDF resume in an ATS-like manner.
+    pdf_path may also be in-memory bytes or a binary file object.
+    parallel=None shards pages across a process pool only for documents
+    of at least PARALLEL_MIN_PAGES pages; output is identical either way.
+    preserve_lines keeps line breaks (whitespace within lines is still
+    collapsed); replacing them with spaces gives the default output.
+    """
+    separator = "\n" if preserve_lines else " "
+    return separator.join(
+        chunk for chunk, _ in iter_page_chunks(
+            pdf_path, parallel=parallel, preserve_lines=preserve_lines
+        )
+    )
+
+
+def stream_resume(
+    pdf_path: PdfSource,
+    char_budget: Optional[int] = None
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Extraction and section splitting in one streaming pass. Pages keep
+    their line structure and font hints so the splitter sees real lines;
+    the returned text is the flat, single-line form used for scoring.
+    """
+    splitter = SectionSplitter()
+    pieces = []
+
+    for chunk, emphasized in iter_page_chunks(
+        pdf_path, char_budget=char_budget, preserve_lines=True
+    ):
+        splitter.header_hints.update(emphasized)
+        splitter.feed("\n" + chunk if pieces else chunk)
+        flat = chunk.replace("\n", " ")
+        pieces.append(" " + flat if pieces else flat)
+
+    return "".join(pieces), splitter.close()
+
+
+# --------------------------------------------------
+# PARSED-TEXT CACHE (KEYED BY PDF CONTENT HASH)
+# --------------------------------------------------
+# Re-uploading the same PDF (e.g. to try another target role) skips
+# parsing entirely. Set PARSE_CACHE_PATH to add a disk tier; resumes
+# contain personal data, so it is memory-only by default.
+
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", "")
+
+# Parse in a resource-limited child process (see pdf_sandbox) by default.
+PDF_SANDBOX = os.getenv("PDF_SANDBOX", "0") == "1"
+
+_UNSET = object()
+_parse_cache = _UNSET
+
+
+def _get_parse_cache() -> Optional[TieredCache]:
+    global _parse_cache
+    if _parse_cache is _UNSET:
+        _parse_cache = build_cache(
+            namespace="parse",
+            path=PARSE_CACHE_PATH,
+            max_entries=256,
+            max_bytes=128 * 1024 * 1024
+        )
+    return _parse_cache
+
+
+def set_parse_cache(cache: Optional[TieredCache]) -> None:
+    """
+    Swap the parse cache (any object with get/set), or pass None to disable it.
+    """
+    global _parse_cache
+    _parse_cache = cache
+
+
+def read_pdf_bytes(source: PdfSource) -> Union[bytes, memoryview]:
+    """
+    The raw document bytes, without copying in-memory input.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).cast("B")
+    if isinstance(source, io.BytesIO):
+        return source.getbuffer()
+    source.seek(0)
+    return source.read()
+
+
+def pdf_sha256(data: Union[bytes, memoryview]) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def parse_resume(
+    pdf_path: PdfSource,
+    sandbox: Optional[bool] = None,
+    char_budget: Optional[int] = None
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Normalized text + sections, cached by SHA-256 of the PDF bytes
+    and PARSER_VERSION. With sandbox=True parsing runs under time and
+    memory budgets and may raise pdf_sandbox.PdfParseError.
+    char_budget lets scoring-only callers stop after roughly that many
+    characters (whole pages).
+    """
+    sandboxed = PDF_SANDBOX if sandbox is None else sandbox
+    if sandboxed:
+        # the sandbox always extracts the whole document
+        char_budget = None
+
+    data = read_pdf_bytes(pdf_path)
+    key = f"{PARSER_VERSION}:{pdf_sha256(data)}"
+    if char_budget is not None:
+        key += f":{char_budget}"
+
+    cache = _get_parse_cache()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached["text"], dict(cached["sections"])
+
+    if sandboxed:
+        from pdf_sandbox import extract_layout_sandboxed
+        lines, emphasized = extract_layout_sandboxed(data)
+        resume_text = lines.replace("\n", " ")
+        sections = split_into_sections(lines, header_hints=set(emphasized))
+    else:
+        resume_text, sections = stream_resume(data, char_budget=char_budget)
 
-    return full_text
+    if cache is not None:
+        cache.set(key, {"text": resume_text, "sections": dict(sections)})
+    return resume_text, sections
 
 
 if __name__ == "__main__":
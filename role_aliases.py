@@ -0,0 +1,113 @@
+# role_aliases.py
+#
+# Job-title alias index: maps titles such as "Sr. MLE" or "Data Analyst II"
+# onto ROLE_PROFILES keys. Aliases come from role_aliases.json (plus the
+# built-in ROLE_TITLE_RULES) and are stored twice:
+#
+#   - an exact-match hash on the normalized title, and
+#   - a token trie, scanned from every token position, for titles that
+#     only contain an alias ("Senior Platform Engineer, Payments").
+#
+# Both lookups cost time proportional to the title length, independent
+# of how many aliases or profiles exist.
+
+import json
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+ALIAS_FORMAT = 1
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+# marks an alias ending at a trie node
+_END = ""
+
+
+class AliasMatch(NamedTuple):
+    key: str        # ROLE_PROFILES key
+    alias: str      # normalized alias that matched
+    method: str     # "exact" or "alias"
+
+
+def tokenize(title: str, drop: Iterable[str] = ()) -> List[str]:
+    """
+    Lowercased word tokens; tokens in drop (seniority / level words)
+    are removed.
+    """
+    drop = set(drop)
+    return [t for t in _TOKEN.findall(title.lower()) if t not in drop]
+
+
+class AliasIndex:
+    """
+    Exact hash + token trie over normalized aliases. When several aliases
+    occur in a title, the one covering the most tokens wins, then the one
+    registered first, then the leftmost.
+    """
+
+    def __init__(self, level_tokens: Iterable[str] = ()):
+        self.level_tokens = frozenset(level_tokens)
+        self._exact: Dict[str, Tuple[int, str]] = {}
+        self._trie: Dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, alias: str, key: str) -> None:
+        """
+        Registers alias for key; the first registration of an alias wins.
+        """
+        tokens = tokenize(alias, self.level_tokens)
+        normalized = " ".join(tokens)
+        if not tokens or normalized in self._exact:
+            return
+
+        priority = len(self._exact)
+        self._exact[normalized] = (priority, key)
+
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = (priority, key, normalized)
+
+    def match(self, title: str) -> Optional[AliasMatch]:
+        tokens = tokenize(title, self.level_tokens)
+
+        exact = self._exact.get(" ".join(tokens))
+        if exact is not None:
+            return AliasMatch(exact[1], " ".join(tokens), "exact")
+
+        best = None
+        best_rank = None
+        for start in range(len(tokens)):
+            node = self._trie
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                hit = node.get(_END)
+                if hit is not None:
+                    priority, key, alias = hit
+                    rank = (-(end - start + 1), priority, start)
+                    if best_rank is None or rank < best_rank:
+                        best_rank = rank
+                        best = AliasMatch(key, alias, "alias")
+
+        return best
+
+
+def load_alias_file(path: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    (level_tokens, {profile key: [aliases]}) from an alias file.
+    A missing file or another format version yields no aliases.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return [], {}
+
+    if data.get("format") != ALIAS_FORMAT:
+        return [], {}
+
+    return data.get("level_tokens", []), data.get("aliases", {})
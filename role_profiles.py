@@ -1,5 +1,13 @@
 # role_profiles.py
 
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
+
+from cache_store import make_key
+from role_aliases import AliasIndex, AliasMatch, load_alias_file
+
 ROLE_PROFILES = {
 
     "software_engineer": {
@@ -178,27 +186,119 @@ ROLE_PROFILES = {
 }
 
 
-def resolve_role_profile(target_role: str):
+# --------------------------------------------------
+# COMPILED PROFILES
+# --------------------------------------------------
+
+@dataclass(frozen=True)
+class RoleProfile:
+    """
+    Immutable, compiled form of a ROLE_PROFILES entry. Signal tuples keep
+    the source order (diagnostics are reported in it); phrases is the
+    set of every must-have and strong signal for membership tests.
+    """
+
+    __slots__ = ("key", "must_have", "strong_signals", "red_flags", "phrases")
+
+    key: str
+    must_have: Tuple[str, ...]
+    strong_signals: Tuple[str, ...]
+    red_flags: Tuple[str, ...]
+    phrases: FrozenSet[str]
+
+
+def compile_profile(key: str, profile: Dict[str, List[str]]) -> RoleProfile:
+    return RoleProfile(
+        key=key,
+        must_have=tuple(profile["must_have"]),
+        strong_signals=tuple(profile["strong_signals"]),
+        red_flags=tuple(profile["red_flags"]),
+        phrases=frozenset(profile["must_have"] + profile["strong_signals"])
+    )
+
+
+COMPILED_PROFILES: Dict[str, RoleProfile] = {
+    key: compile_profile(key, profile)
+    for key, profile in ROLE_PROFILES.items()
+}
+
+
+def profile_fingerprint(profile: RoleProfile) -> str:
+    """
+    Content hash of a profile; changes whenever any of its lists does.
+    """
+    return make_key(
+        profile.key,
+        profile.must_have,
+        profile.strong_signals,
+        profile.red_flags
+    )
+
+
+# --------------------------------------------------
+# TITLE RESOLUTION (ALIAS INDEX)
+# --------------------------------------------------
+
+# Built-in aliases, registered before role_aliases.json so they win any
+# clash; within equal-length matches, earlier entries take precedence.
+ROLE_TITLE_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("machine_learning_engineer", ("machine learning", "ml", "mlops")),
+    ("data_scientist", ("data scientist",)),
+    ("backend_engineer", ("backend",)),
+    ("frontend_engineer", ("frontend",)),
+    ("product_manager", ("product",)),
+    ("business_analyst", ("business analyst",)),
+    ("cybersecurity_engineer", ("security", "cybersecurity")),
+    ("software_engineer", ("software", "developer", "developers")),
+]
+
+ROLE_ALIASES_PATH = os.getenv(
+    "ROLE_ALIASES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "role_aliases.json")
+)
+
+
+def build_alias_index(path: str = ROLE_ALIASES_PATH) -> AliasIndex:
+    level_tokens, aliases = load_alias_file(path)
+    index = AliasIndex(level_tokens)
+
+    for key, phrases in ROLE_TITLE_RULES:
+        for phrase in phrases:
+            index.add(phrase, key)
+
+    for key, names in aliases.items():
+        if key not in ROLE_PROFILES:
+            continue
+        for name in names:
+            index.add(name, key)
+
+    return index
+
+
+ALIAS_INDEX = build_alias_index()
+
+
+@lru_cache(maxsize=4096)
+def resolve_role(target_role: str) -> AliasMatch:
+    """
+    Profile key for a job title, with the alias that selected it and how
+    ("exact", "alias", or "default" when nothing matched -> generic).
+    """
+    match = ALIAS_INDEX.match(target_role)
+    if match is None:
+        return AliasMatch("generic", "", "default")
+    return match
+
+
+def resolve_role_key(target_role: str) -> str:
+    """
+    Maps arbitrary role names to a ROLE_PROFILES key.
+    """
+    return resolve_role(target_role).key
+
+
+def resolve_role_profile(target_role: str) -> RoleProfile:
     """
     Maps arbitrary role names to known profiles.
     """
-    role = target_role.lower()
-
-    if "machine learning" in role or "ml" in role:
-        return ROLE_PROFILES["machine_learning_engineer"]
-    if "data scientist" in role:
-        return ROLE_PROFILES["data_scientist"]
-    if "backend" in role:
-        return ROLE_PROFILES["backend_engineer"]
-    if "frontend" in role:
-        return ROLE_PROFILES["frontend_engineer"]
-    if "product" in role:
-        return ROLE_PROFILES["product_manager"]
-    if "business analyst" in role:
-        return ROLE_PROFILES["business_analyst"]
-    if "security" in role:
-        return ROLE_PROFILES["cybersecurity_engineer"]
-    if "software" in role or "developer" in role:
-        return ROLE_PROFILES["software_engineer"]
-
-    return ROLE_PROFILES["generic"]
+    return COMPILED_PROFILES[resolve_role_key(target_role)]
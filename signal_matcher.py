@@ -0,0 +1,141 @@
+# signal_matcher.py
+#
+# Aho-Corasick automaton over every role phrase and implicit keyword, so
+# one pass over the resume text answers all "phrase in text" checks that
+# the scorers used to run one substring scan at a time.
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Set
+
+
+class KeywordAutomaton:
+    """
+    Multi-pattern substring matcher. find() returns exactly the patterns
+    p for which `p in text` is True, in a single pass over text.
+    """
+
+    FOLD_DEPTH = 4
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: FrozenSet[str] = frozenset(p for p in patterns if p)
+
+        # trie: goto[state] maps a character to the next state
+        goto: List[Dict[str, int]] = [{}]
+        output: Dict[int, str] = {}
+
+        for pattern in self.patterns:
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                state = nxt
+            output[state] = pattern
+
+        # BFS: failure links, plus a dictionary link to the nearest state
+        # on the failure chain that ends a pattern (0 when none). Only
+        # states within FOLD_DEPTH of the root get a full transition table
+        # (failure links folded in) — matching spends most of its time
+        # there. Deeper states keep just their trie edges and find() walks
+        # their failure links, so memory stays linear in total pattern
+        # length.
+        fail = [0] * len(goto)
+        dict_link = [0] * len(goto)
+        depth = [0] * len(goto)
+        delta: List[Dict[str, int]] = list(goto)
+
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            if state and depth[state] <= self.FOLD_DEPTH:
+                delta[state] = {**delta[fail[state]], **goto[state]}
+
+            for ch, nxt in goto[state].items():
+                if state:
+                    f = fail[state]
+                    while depth[f] > self.FOLD_DEPTH and ch not in goto[f]:
+                        f = fail[f]
+                    fail[nxt] = delta[f].get(ch, 0)
+                link = fail[nxt]
+                dict_link[nxt] = link if link in output else dict_link[link]
+                depth[nxt] = depth[state] + 1
+                queue.append(nxt)
+
+        self._delta = delta
+        self._fail = fail
+        self._folded = [d <= self.FOLD_DEPTH for d in depth]
+        # first state on each state's output chain (0: nothing ends here)
+        self._emit = [s if s in output else dict_link[s] for s in range(len(goto))]
+        self._dict_link = dict_link
+        self._output = output
+
+    def find(self, text: str) -> Set[str]:
+        delta = self._delta
+        fail = self._fail
+        folded = self._folded
+        emit = self._emit
+        dict_link = self._dict_link
+        output = self._output
+        found: Set[str] = set()
+        state = 0
+
+        for ch in text:
+            nxt = delta[state].get(ch)
+            while nxt is None:
+                if folded[state]:
+                    # dead end in a full table: back to the root
+                    nxt = 0
+                    break
+                state = fail[state]
+                nxt = delta[state].get(ch)
+            state = nxt
+
+            hit = emit[state]
+            while hit:
+                found.add(output[hit])
+                hit = dict_link[hit]
+
+        return found
+
+
+class SignalHits(NamedTuple):
+    # role phrases that occur literally in the text
+    phrases: FrozenSet[str]
+    # phrases found literally or through one of their implicit keywords
+    signals: FrozenSet[str]
+
+
+class SignalMatcher:
+    """
+    Matches role phrases and their implicit keywords (e.g. "fastapi"
+    for "deployment") in one automaton pass.
+    """
+
+    def __init__(
+        self,
+        phrases: Iterable[str],
+        implicit_keywords: Dict[str, List[str]]
+    ):
+        self.phrases = frozenset(phrases)
+        self._implied_by: Dict[str, Set[str]] = {}
+        for signal, keywords in implicit_keywords.items():
+            for keyword in keywords:
+                self._implied_by.setdefault(keyword, set()).add(signal)
+
+        self._automaton = KeywordAutomaton(self.phrases | set(self._implied_by))
+
+    def match(self, text: str, lowered: bool = False) -> SignalHits:
+        """
+        text is lowercased here, the same way the scorers compare,
+        unless the caller passes lowered=True.
+        """
+        found = self._automaton.find(text if lowered else text.lower())
+
+        phrases = found & self.phrases
+        signals = set(phrases)
+        for keyword in found:
+            signals |= self._implied_by.get(keyword, set())
+
+        return SignalHits(frozenset(phrases), frozenset(signals))
@@ -0,0 +1,173 @@
+# singleflight.py
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Broadcast:
+    """
+    Items a streamed flight has produced so far, shared by its followers.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.items: List[object] = []
+        self.followers = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+    def publish(self, item: object) -> None:
+        with self.cond:
+            self.items.append(item)
+            self.cond.notify_all()
+
+    def finish(self, error: Optional[BaseException]) -> None:
+        with self.cond:
+            self.done = True
+            self.error = error
+            self.cond.notify_all()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one execution.
+
+    The first caller for a key (the leader) runs the work; everyone else
+    arriving before it finishes waits for the same result or exception.
+    The registry is process-wide and thread-safe, so threads and
+    coroutines on different event loops (e.g. one asyncio.run per
+    Streamlit session) all share the same in-flight call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._streams)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._release(key)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        future, leader = self._claim(key)
+        if not leader:
+            # shield: a cancelled follower must not cancel the shared call
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._release(key)
+
+    def stream(self, key: str, fn: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """
+        Streaming counterpart of do(): the leader iterates fn() and every
+        follower receives the same items as they arrive, replaying the
+        ones produced before it joined. If the leader stops reading while
+        followers are attached, the rest of fn() is read on a background
+        thread so they still get the whole stream.
+        """
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = _Broadcast()
+            else:
+                broadcast.followers += 1
+
+        if leader:
+            yield from self._lead(key, broadcast, fn)
+            return
+
+        received = 0
+        while True:
+            with broadcast.cond:
+                while received == len(broadcast.items) and not broadcast.done:
+                    broadcast.cond.wait()
+                pending = broadcast.items[received:]
+                done, error = broadcast.done, broadcast.error
+
+            for item in pending:
+                yield item
+            received += len(pending)
+
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+    def _lead(self, key: str, broadcast: _Broadcast, fn: Callable[[], Iterator[T]]) -> Iterator[T]:
+        items = fn()
+        try:
+            for item in items:
+                broadcast.publish(item)
+                yield item
+        except GeneratorExit:
+            with self._lock:
+                hand_off = broadcast.followers > 0
+                if not hand_off:
+                    del self._streams[key]
+            if hand_off:
+                threading.Thread(
+                    target=self._drain, args=(key, broadcast, items), daemon=True
+                ).start()
+            else:
+                items.close()
+                broadcast.finish(None)
+            raise
+        except BaseException as e:
+            self._end_stream(key, broadcast, e)
+            raise
+        self._end_stream(key, broadcast, None)
+
+    def _drain(self, key: str, broadcast: _Broadcast, items: Iterator[T]) -> None:
+        error: Optional[BaseException] = None
+        try:
+            for item in items:
+                broadcast.publish(item)
+        except BaseException as e:
+            error = e
+        self._end_stream(key, broadcast, error)
+
+    def _end_stream(self, key: str, broadcast: _Broadcast, error: Optional[BaseException]) -> None:
+        with self._lock:
+            del self._streams[key]
+        broadcast.finish(error)
@@ -0,0 +1,47 @@
+# tests/test_batch_runner.py
+#
+# End-to-end run of the batch CLI on the fake LLM backend. Run from the
+# repository root:
+#
+#     python -m pytest tests
+
+import json
+import os
+import subprocess
+import sys
+
+from pypdf import PdfReader, PdfWriter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_batch_exits_after_multi_page_pdfs(tmp_path):
+    # long enough for page-parallel extraction (PDF_PARALLEL_MIN_PAGES)
+    sample = PdfReader(os.path.join(ROOT, "sample_resume.pdf"))
+    writer = PdfWriter()
+    while len(writer.pages) < 12:
+        for page in sample.pages:
+            writer.add_page(page)
+
+    inputs = tmp_path / "pdfs"
+    inputs.mkdir()
+    for name in ("a.pdf", "b.pdf"):
+        writer.write(str(inputs / name))
+    # distinct content, so the two PDFs are separate jobs
+    with open(inputs / "b.pdf", "ab") as f:
+        f.write(b"\n% b\n")
+
+    out = tmp_path / "reports.jsonl"
+    env = dict(os.environ, LLM_BACKEND="fake", LLM_CACHE_PATH="", PDF_WORKERS="4",
+               PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-m", "report_generator", "batch", str(inputs),
+         "--role", "ML Engineer", "--out", str(out), "--workers", "2"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "[batch] 2 reports" in result.stderr
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(records) == 2
+    assert all("report" in record for record in records)
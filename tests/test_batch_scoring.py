@@ -0,0 +1,85 @@
+# tests/test_batch_scoring.py
+#
+# batch_scoring must reproduce the per-resume engines exactly. Run from
+# the repository root:
+#
+#     python -m pytest tests
+
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import SIGNAL_MATCHER, score_resume  # noqa: E402
+from batch_scoring import score_batch, score_corpus  # noqa: E402
+from evaluation_engine import evaluate_resume, recommend_best_roles  # noqa: E402
+from features import extract_features  # noqa: E402
+from role_profiles import COMPILED_PROFILES, compile_profile, resolve_role_key  # noqa: E402
+
+SECTIONS = ("header", "skills", "experience", "projects", "education")
+
+
+def random_corpus(n: int, seed: int = 2):
+    rng = random.Random(seed)
+    words = sorted(SIGNAL_MATCHER._automaton.patterns) + ["the", "a", "12", "3%", "x9", "data"] * 5
+
+    def body() -> str:
+        return " ".join(rng.choice(words) for _ in range(rng.randint(0, 260)))
+
+    corpus = []
+    for _ in range(n):
+        sections = {name: body() for name in rng.sample(SECTIONS, rng.randint(0, len(SECTIONS)))}
+        if rng.random() < 0.2:
+            # around the skills-section length thresholds
+            sections["skills"] = "x" * rng.randint(780, 920)
+        corpus.append((" ".join(sections.values()), sections))
+    return corpus
+
+
+def test_batch_matches_per_resume_engines():
+    titles = {key: key.replace("_", " ") for key in COMPILED_PROFILES}
+    for key, title in titles.items():
+        assert resolve_role_key(title) == key
+
+    corpus = random_corpus(300)
+    features_list = [extract_features(text, sections) for text, sections in corpus]
+    batch = score_batch(features_list)
+
+    for i, ((text, sections), features) in enumerate(zip(corpus, features_list)):
+        assert batch.recommended_roles(i) == recommend_best_roles(text, features=features)
+
+        for r, key in enumerate(batch.roles):
+            score, _, diagnostics = score_resume(text, sections, titles[key], features=features)
+            evaluation = evaluate_resume(text, sections, diagnostics, titles[key], features=features)
+
+            assert batch.score[i, r] == score
+            assert batch.missing_must_have[i, r] == len(diagnostics["missing_must_have"])
+            assert batch.weak_signals[i, r] == len(diagnostics["weak_signals"])
+            assert batch.ats_score[i] == evaluation["ats_score"]
+            assert batch.role_readiness[i, r] == evaluation["role_readiness_score"]
+
+
+def test_custom_profile_phrases_are_matched():
+    profiles = dict(COMPILED_PROFILES)
+    profiles["custom"] = compile_profile("custom", {
+        "must_have": ["tensorflow", "kubeflow pipelines"],
+        "strong_signals": ["deployment"],
+        "red_flags": []
+    })
+    assert "kubeflow pipelines" not in SIGNAL_MATCHER.phrases
+
+    text = "Built Kubeflow Pipelines for TensorFlow models behind a FastAPI service."
+    sections = {"projects": text}
+    r = list(profiles).index("custom")
+
+    for scores in (
+        score_corpus([(text, sections)], profiles=profiles),
+        score_batch([extract_features(text, sections)], profiles=profiles)
+    ):
+        assert scores.missing_must_have[0, r] == 0
+        # "fastapi" implies deployment
+        assert scores.weak_signals[0, r] == 0
+        assert isinstance(scores.score, np.ndarray)
@@ -0,0 +1,52 @@
+# tests/test_feature_store.py
+#
+# Re-scoring from the store must agree with scoring freshly parsed
+# resumes. Run from the repository root:
+#
+#     python -m pytest tests
+
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import SIGNAL_MATCHER  # noqa: E402
+from batch_scoring import score_corpus  # noqa: E402
+from feature_store import FeatureStore  # noqa: E402
+from resume_parser import parse_resume  # noqa: E402
+from role_profiles import COMPILED_PROFILES, compile_profile  # noqa: E402
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_resume.pdf")
+
+
+def test_ingest_after_custom_profile_rescore(tmp_path):
+    first = tmp_path / "first.pdf"
+    second = tmp_path / "second.pdf"
+    shutil.copy(SAMPLE, first)
+    shutil.copy(SAMPLE, second)
+    # same text, different bytes: stored as a second row
+    with open(second, "ab") as f:
+        f.write(b"\n% second\n")
+
+    profiles = dict(COMPILED_PROFILES)
+    profiles["custom"] = compile_profile("custom", {
+        "must_have": ["certifications", "python"],
+        "strong_signals": [],
+        "red_flags": []
+    })
+    assert "certifications" not in SIGNAL_MATCHER.phrases
+    r = list(profiles).index("custom")
+
+    store = FeatureStore(str(tmp_path / "store"))
+    assert store.ingest([str(first)]) == 1
+    assert store.rescore(profiles).missing_must_have[0, r] == 0
+
+    # ingested after the custom phrase joined the vocab
+    assert store.ingest([str(second)]) == 1
+    stored = store.rescore(profiles)
+    fresh = score_corpus([parse_resume(str(second))], profiles=profiles)
+
+    assert stored.missing_must_have[1, r] == fresh.missing_must_have[0, r] == 0
+    assert (stored.score[1] == fresh.score[0]).all()
+    assert (stored.score[0] == stored.score[1]).all()
@@ -0,0 +1,51 @@
+# tests/test_signal_matcher.py
+#
+# KeywordAutomaton.find must equal naive substring search, including for
+# patterns that run past the folded depth. Run from the repository root:
+#
+#     python -m pytest tests
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import IMPLICIT_SIGNAL_MAP, SIGNAL_MATCHER  # noqa: E402
+from signal_matcher import KeywordAutomaton  # noqa: E402
+
+
+def test_find_equals_substring_search_on_random_patterns():
+    rng = random.Random(15)
+    depth = KeywordAutomaton.FOLD_DEPTH
+
+    for alphabet in ("ab", "abc", "ab c-é"):
+        def word(lo: int, hi: int) -> str:
+            return "".join(rng.choice(alphabet) for _ in range(rng.randint(lo, hi)))
+
+        for _ in range(200):
+            # short and long patterns over a tiny alphabet: heavy overlap,
+            # long failure chains and matches ending below FOLD_DEPTH
+            patterns = [word(1, depth * 3) for _ in range(rng.randint(1, 40))]
+            automaton = KeywordAutomaton(patterns)
+            for _ in range(5):
+                text = word(0, 200)
+                assert automaton.find(text) == {p for p in set(patterns) if p in text}
+
+
+def test_find_equals_substring_search_on_profile_phrases():
+    rng = random.Random(16)
+    patterns = sorted(SIGNAL_MATCHER._automaton.patterns)
+    automaton = KeywordAutomaton(patterns)
+
+    for _ in range(300):
+        pieces = [rng.choice(patterns) for _ in range(rng.randint(0, 30))]
+        # split phrases across joins and glue them together
+        text = "".join(p[rng.randint(0, len(p) - 1):] + rng.choice(["", " ", "x"]) for p in pieces)
+        assert automaton.find(text) == {p for p in patterns if p in text}
+
+
+def test_implicit_keywords_imply_their_signal():
+    for signal, keywords in IMPLICIT_SIGNAL_MAP.items():
+        for keyword in keywords:
+            assert signal in SIGNAL_MATCHER.match(f"built it with {keyword} daily").signals
@@ -0,0 +1,67 @@
+# tests/test_singleflight.py
+#
+# Identical LLM calls in flight at once reach the backend once. Run from
+# the repository root:
+#
+#     python -m pytest tests
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import llm_engine  # noqa: E402
+from llm_backends import FakeBackend  # noqa: E402
+from singleflight import SingleFlight  # noqa: E402
+
+
+@pytest.fixture
+def backend():
+    fake = FakeBackend(latency=0.3)
+    llm_engine.set_backend(fake)
+    llm_engine.set_llm_cache(None)
+    yield fake
+    llm_engine.set_backend(None)
+    llm_engine.set_llm_cache(llm_engine._UNSET)
+
+
+def test_identical_streams_share_one_request(backend):
+    results = []
+    barrier = threading.Barrier(6)
+
+    def session():
+        barrier.wait()
+        results.append("".join(llm_engine.stream_llm("system", "same prompt " * 20)))
+
+    threads = [threading.Thread(target=session) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.calls == 1
+    assert len(results) == 6 and len(set(results)) == 1
+
+
+def test_followers_finish_a_stream_the_leader_abandons():
+    flights = SingleFlight()
+    runs = []
+
+    def produce():
+        runs.append(1)
+        yield from ("a", "b", "c")
+
+    leader = flights.stream("k", produce)
+    assert next(leader) == "a"
+    follower = flights.stream("k", produce)
+    assert next(follower) == "a"
+
+    # e.g. the leader's Streamlit session was closed mid-stream
+    leader.close()
+
+    assert list(follower) == ["b", "c"]
+    assert runs == [1]
+    assert flights.in_flight() == 0